@@ -1,25 +1,18 @@
 # -------------------------------------- IMPORTS --------------------------------------
 
 # Dash
-from dash import Dash, html, dcc, callback, Input, Output, State
+from dash import Dash, html, dcc, callback, ctx, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
 import dash.dash_table as dash_table
+from flask import jsonify, request
 
-# Plotly
-import plotly.graph_objects as go
-import plotly.express as px
-import matplotlib.pyplot as plt
+# OS
+import os
+import hmac
+from functools import partial
 
-# Networkx
-import networkx as nx 
-
-# Numpy, Pandas, Random
-import numpy as np
-import pandas as pd
-import random
-
-# Import dataset preprocessing function
-from datasetPreprocessingExplore import preprocess_dataset
+# Import the dataset registry
+from datasetRegistry import datasets
 
 # Import graph network function 
 import graphNetwork
@@ -27,569 +20,595 @@ import graphNetwork
 # Import dashboard preprocessing function
 import datasetPreprocessingInsights
 
+# Import server side table paging, sorting and filtering
+from tableQuery import PAGE_SIZE, FilterQueryError, query_table
+from filterIndex import FilterIndex
+from resultCache import ResultCache, cache_key
+
+# Import lazy figure registry
+from figureRegistry import FigureRegistry
+
+# Import dataset hot reload
+from datasetReload import DatasetReloader
+
 # -------------------------------------- APP SETUP --------------------------------------
 
 # Create a Dash app
 app = Dash(__name__, suppress_callback_exceptions=True, external_stylesheets=[dbc.themes.FLATLY])
 
+# WSGI entry point for production servers (see productionServer.py)
+server = app.server
+
+# Build the figures in the background once the server started (FIGURE_WARMUP=0 builds them on first access)
+FIGURE_WARMUP = os.environ.get('FIGURE_WARMUP', '1') != '0'
+
 # -------------------------------------- DATA PREPROCESSING --------------------------------------
 
-filepath = 'Datasets/Lobbyregister2024_full.csv'
+# Everything the callbacks read from one version of the datasets. A reload replaces it as a whole,
+# callbacks read it once so a request in flight keeps working with the version it started with.
+class DashboardData:
 
-# Load original dataset 
-oDf = pd.read_csv(filepath)
+    def __init__(self, registry):
+        # Registry the datasets and the figures of this version are taken from
+        self.registry = registry
 
-# Set original dataset index
-oDf[' index'] = range(1, len(oDf) + 1)
+        # Original dataset with its index (loaded once by the dataset registry)
+        self.oDf = registry.get('original')
 
-# Preprocess the dataset
-cDf = preprocess_dataset(filepath)
+        # Preprocessed dataset (loaded from the snapshot cache when the CSV did not change)
+        self.cDf = registry.get('explore')
 
-# -------------------------------------- PLOTS --------------------------------------
+        # Row masks for the filter dropdowns of the cleaned table
+        self.filterIndex = FilterIndex(self.cDf)
 
-# Create an example plot
-fig = go.Figure(
-    go.Scattergl(
-        x = np.random.randn(100),
-        y = np.random.randn(100),
-        mode='markers',
-        marker=dict(color=random.sample(['#ecf0f1']*500 + ["#3498db"]*500, 1000), line_width=1)
-    )
-)
-figX = go.Figure(
-    go.Scattergl(
-        x = np.random.randn(100),
-        y = np.random.randn(100),
-        mode='markers',
-        marker=dict(color=random.sample(['#ecf0f1']*500 + ["#3498db"]*500, 1000), line_width=1)
-    )
-)
+        # Version of the dataset, part of the explore table cache keys
+        self.datasetVersion = registry.version('original')
 
-# Update the layout of the plot
-fig.update_layout(plot_bgcolor='#010103', width=380, height=380,
-                  xaxis_visible=False, yaxis_visible=False, showlegend=False, margin=dict(l=0,r=0,t=0,b=0))
+        # Insights and network figures of the cleaned dataset. The dataset is loaded right away, figures built
+        # after its file changed still show the version they are cached for.
+        registry.get('cleaned')
+        self.figures = createFigureRegistry(registry)
 
-# Update the layout of the plot
-figX.update_layout(plot_bgcolor='#010103', width=500, height=760,
-                  xaxis_visible=False, yaxis_visible=False, showlegend=False, margin=dict(l=0,r=0,t=0,b=0))
+# Cache for the explore table responses
+tableCache = ResultCache()
 
 # -------------------------------------- Network Plot --------------------------------------
 
 # Create network
-networkGraphInterests = graphNetwork.createNetworkInterests()
-networkFigureInterests = graphNetwork.plotlyNetworkInterests(networkGraphInterests)
-
-networkFigureInterests.update_layout(
-    plot_bgcolor='black',  # Sets the plot background color to black
-    paper_bgcolor='black',  # Sets the background color of the entire figure to black
-    font=dict(color='white')  # Changes the font color to white for better contrast
-)
+def createFigNetworkInterests(registry):
+    networkGraphInterests = graphNetwork.createNetworkInterests(registry)
+    networkFigureInterests = graphNetwork.plotlyNetworkInterests(networkGraphInterests)
+
+    networkFigureInterests.update_layout(
+        plot_bgcolor='black',  # Sets the plot background color to black
+        paper_bgcolor='black',  # Sets the background color of the entire figure to black
+        font=dict(color='white')  # Changes the font color to white for better contrast
+    )
+    return networkFigureInterests
 
 # Create network
-networkGraphEntities = graphNetwork.createNetworkEntities()
-networkFigureEntities = graphNetwork.plotlyNetworkEntities(networkGraphEntities)
-
-networkFigureEntities.update_layout(
-    plot_bgcolor='black',  # Sets the plot background color to black
-    paper_bgcolor='black',  # Sets the background color of the entire figure to black
-    font=dict(color='white')  # Changes the font color to white for better contrast
-)
-
-# -------------------------------------- Insights Plots --------------------------------------
-
-# Interests 
-
-# Plot 1
-figUniqueInterests = datasetPreprocessingInsights.createFigUniqueInterests()
-
-# Plot 2
-figAverageInterests = datasetPreprocessingInsights.createFigAverageInterests()
-
-# Plot 3
-figBiggestInterestAreas = datasetPreprocessingInsights.createFigBiggestInterestAreas()
-
-
-# Spendings
-
-figEmployeePie = datasetPreprocessingInsights.createFigEmployeesPie()
-
-# Plot 1
-figSpendingsPie = datasetPreprocessingInsights.createFigSpendingsPie()
-
-# Plot 2
-figSpendingsScatter = datasetPreprocessingInsights.createFigSpendingsScatter()
-
-# Plot 3
-figSpendingPerEmployee = datasetPreprocessingInsights.createFigSpendingsPerEmployee()
-
-
-
-# Entities
-
-# Plot 1
-figNumberOfEntities = datasetPreprocessingInsights.createFigNumberOfEntities()
-
-# Plot 2
-figAverageEmployees = datasetPreprocessingInsights.createFigAverageEmployees()
-
-# Plot 3
-figInterestsPerEntity = datasetPreprocessingInsights.createFigInterestPerEntity()
-
-
-
-# Create a Dash container
-app.layout = dbc.Container([
-    # -------------------------------------- NAVIGATION & FILTERS --------------------------------------
-
-    html.Div([
-        # Title & Info
-        html.Div([
-            # Title
-            html.H1([ html.Span("Lobbyism"), html.Br(),html.Span("in Germany")]),
-            # Info text
-            html.P("This dashboard shows selected insights from the official German parliament lobby register. It also provides an explorative feature, that allows users to search a cleaned version of the lobby dataset, as well as a network that reveals connections between different entities and their interests.")
-        ],style={"vertical-alignment": "top", 'margin-bottom': 20, "height": 270}),
-
-        # Tab selection
-        html.Div([
-            #Radiobuttons
-            html.Div(
-                dbc.RadioItems(
-                    id='radio-button-group',
-                    className='btn-group',
-                    inputClassName='btn-check',
-                    labelClassName="btn btn-outline-light",
-                    labelCheckedClassName="btn btn-light",
-                    options=[
-                        {"label": "Insights", "value": 'INSIGHTS'},
-                        {"label": "Explore", "value": 'EXPLORE'},
-                        {"label": "Network", "value": 'NETWORK'}
-                    ],
-                    value='INSIGHTS',
-                    style={'width': '100%'}
-                ), 
-                style={'width': 312}
-            ),
-            #About button
-            html.Div(
-                # Button
-                dbc.Button("About", id="open-about-modal", className="btn btn-info", n_clicks=0), 
-                style={'width': 104}),
-                # About Modal
-                dbc.Modal([
-                    dbc.ModalHeader(dbc.ModalTitle("About")),
-                    dbc.ModalBody("..."),
-                    dbc.ModalFooter([
-                        html.A("GIT", href="https://gitlab.informatik.uni-bremen.de/tspradau/lobbyism-in-germany", className="btn btn-primary"),
-                    dbc.Button("Close", id="close-about-modal", className="ms-auto", n_clicks=0)
-                    ]),
-                ], id="about-modal", is_open=False),  # Initially hidden
-        ], 
-        style={'display': 'flex'}),
-
-        # -------------------------------------- Filter Section --------------------------------------
+def createFigNetworkEntities(registry):
+    networkGraphEntities = graphNetwork.createNetworkEntities(registry)
+    networkFigureEntities = graphNetwork.plotlyNetworkEntities(networkGraphEntities)
+
+    networkFigureEntities.update_layout(
+        plot_bgcolor='black',  # Sets the plot background color to black
+        paper_bgcolor='black',  # Sets the background color of the entire figure to black
+        font=dict(color='white')  # Changes the font color to white for better contrast
+    )
+    return networkFigureEntities
+
+# -------------------------------------- Figure Registry --------------------------------------
+
+# Figures are built on first access of their chapter (or by the warm-up after the server started),
+# they are cached on disk for the version of the insights dataset they are built from.
+# The builders get the dataset registry, the figures only ever show the datasets of that registry.
+def createFigureRegistry(registry):
+    figures = FigureRegistry(dataset_hash=registry.version('cleaned'))
+
+    # Interests 
+    figures.register('unique-interests', partial(datasetPreprocessingInsights.createFigUniqueInterests, registry))
+    figures.register('average-interests', partial(datasetPreprocessingInsights.createFigAverageInterests, registry))
+    figures.register('biggest-interest-areas', partial(datasetPreprocessingInsights.createFigBiggestInterestAreas, registry))
+
+    # Spendings
+    figures.register('employees-pie', partial(datasetPreprocessingInsights.createFigEmployeesPie, registry))
+    figures.register('spendings-pie', partial(datasetPreprocessingInsights.createFigSpendingsPie, registry))
+    figures.register('spendings-scatter', partial(datasetPreprocessingInsights.createFigSpendingsScatter, registry))
+    figures.register('spending-per-employee', partial(datasetPreprocessingInsights.createFigSpendingsPerEmployee, registry))
+
+    # Entities
+    figures.register('number-of-entities', partial(datasetPreprocessingInsights.createFigNumberOfEntities, registry))
+    figures.register('average-employees', partial(datasetPreprocessingInsights.createFigAverageEmployees, registry))
+    figures.register('interests-per-entity', partial(datasetPreprocessingInsights.createFigInterestPerEntity, registry))
+
+    # Network
+    figures.register('network-interests', partial(createFigNetworkInterests, registry), version=2)
+    figures.register('network-entities', partial(createFigNetworkEntities, registry), version=3)
+    return figures
+
+# Dataset version served by the callbacks
+current = DashboardData(datasets)
+
+# Figures shown by each chapter of the insights and network tab
+insightsChapterFigures = {
+    'INTERESTS': ['average-interests', 'biggest-interest-areas', 'unique-interests'],
+    'SPENDINGS': ['spending-per-employee', 'spendings-scatter', 'spendings-pie', 'employees-pie'],
+    'ENTITIES_1': ['number-of-entities', 'average-employees'],
+    'ENTITIES_2': ['interests-per-entity'],
+}
+networkChapterFigures = {
+    'INTERESTS': ['network-interests'],
+    'ENTITIES': ['network-entities'],
+}
+insightsFigures = [name for names in insightsChapterFigures.values() for name in names]
+networkFigures = [name for names in networkChapterFigures.values() for name in names]
+
+# Placeholder until the figure of a graph is loaded
+emptyFigure = {'layout': {'plot_bgcolor': 'black', 'paper_bgcolor': 'black',
+                          'xaxis': {'visible': False}, 'yaxis': {'visible': False}}}
+
+# Graph of a registered figure, the figure itself is sent by the chapter callbacks
+def figureGraph(name):
+    return dcc.Graph(id=f'{name}-graph', figure=emptyFigure)
+
+
+
+# Layout of the dataset version served when the page is loaded, the filter and column options follow reloads
+def serveLayout():
+    data = current
+    return dbc.Container([
+        # -------------------------------------- NAVIGATION & FILTERS --------------------------------------
 
-        # Filter section for insights
         html.Div([
+            # Title & Info
+            html.Div([
+                # Title
+                html.H1([ html.Span("Lobbyism"), html.Br(),html.Span("in Germany")]),
+                # Info text
+                html.P("This dashboard shows selected insights from the official German parliament lobby register. It also provides an explorative feature, that allows users to search a cleaned version of the lobby dataset, as well as a network that reveals connections between different entities and their interests.")
+            ],style={"vertical-alignment": "top", 'margin-bottom': 20, "height": 270}),
 
-            # Chapter selection dropdown
+            # Tab selection
             html.Div([
-                dcc.Dropdown(
-                    id='insights-chapter-dropdown',
-                    options=[
-                        {'label': 'Interests', 'value': 'INTERESTS'},
-                        {'label': 'Spendings', 'value': 'SPENDINGS'},
-                        {'label': 'Entities 1', 'value': 'ENTITIES_1'},
-                        {'label': 'Entities 2', 'value': 'ENTITIES_2'}
-                    ],
-                    value='INTERESTS',
-                    clearable=True,
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'background-color': 'black'}
+                #Radiobuttons
+                html.Div(
+                    dbc.RadioItems(
+                        id='radio-button-group',
+                        className='btn-group',
+                        inputClassName='btn-check',
+                        labelClassName="btn btn-outline-light",
+                        labelCheckedClassName="btn btn-light",
+                        options=[
+                            {"label": "Insights", "value": 'INSIGHTS'},
+                            {"label": "Explore", "value": 'EXPLORE'},
+                            {"label": "Network", "value": 'NETWORK'}
+                        ],
+                        value='INSIGHTS',
+                        style={'width': '100%'}
+                    ), 
+                    style={'width': 312}
                 ),
-                #insights chapter texts
-                html.P(datasetPreprocessingInsights.selectInsightsText(1), id='interests-text'),
-                html.P(datasetPreprocessingInsights.selectInsightsText(2), id='spendings-text'),
-                html.P(datasetPreprocessingInsights.selectInsightsText(3), id='entities-text'),
-            ]),
+                #About button
+                html.Div(
+                    # Button
+                    dbc.Button("About", id="open-about-modal", className="btn btn-info", n_clicks=0), 
+                    style={'width': 104}),
+                    # About Modal
+                    dbc.Modal([
+                        dbc.ModalHeader(dbc.ModalTitle("About")),
+                        dbc.ModalBody("..."),
+                        dbc.ModalFooter([
+                            html.A("GIT", href="https://gitlab.informatik.uni-bremen.de/tspradau/lobbyism-in-germany", className="btn btn-primary"),
+                        dbc.Button("Close", id="close-about-modal", className="ms-auto", n_clicks=0)
+                        ]),
+                    ], id="about-modal", is_open=False),  # Initially hidden
+            ], 
+            style={'display': 'flex'}),
+
+            # -------------------------------------- Filter Section --------------------------------------
+
+            # Filter section for insights
+            html.Div([
 
-        ],
-        id='filter-section-insights'
-        ),
+                # Chapter selection dropdown
+                html.Div([
+                    dcc.Dropdown(
+                        id='insights-chapter-dropdown',
+                        options=[
+                            {'label': 'Interests', 'value': 'INTERESTS'},
+                            {'label': 'Spendings', 'value': 'SPENDINGS'},
+                            {'label': 'Entities 1', 'value': 'ENTITIES_1'},
+                            {'label': 'Entities 2', 'value': 'ENTITIES_2'}
+                        ],
+                        value='INTERESTS',
+                        clearable=True,
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'background-color': 'black'}
+                    ),
+                    #insights chapter texts
+                    html.P(datasetPreprocessingInsights.selectInsightsText(1), id='interests-text'),
+                    html.P(datasetPreprocessingInsights.selectInsightsText(2), id='spendings-text'),
+                    html.P(datasetPreprocessingInsights.selectInsightsText(3), id='entities-text'),
+                ]),
 
-         # Filter section for network
-        html.Div([
+            ],
+            id='filter-section-insights'
+            ),
 
-            # Network topic selection dropdown
+             # Filter section for network
             html.Div([
-                dcc.Dropdown(
-                    id='network-chapter-dropdown',
-                    options=[
-                        {'label': 'Interconnections of top level interests and entities', 'value': 'INTERESTS'},
-                        {'label': 'Entities and the distribution of their unique interests', 'value': 'ENTITIES'},
-                    ],
-                    value='INTERESTS',
-                    clearable=True,
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'background-color': 'black', 'display': 'none'}
-                )
-            ]),
 
-        ],
-        id='filter-section-network'
-        ),
+                # Network topic selection dropdown
+                html.Div([
+                    dcc.Dropdown(
+                        id='network-chapter-dropdown',
+                        options=[
+                            {'label': 'Interconnections of top level interests and entities', 'value': 'INTERESTS'},
+                            {'label': 'Entities and the distribution of their unique interests', 'value': 'ENTITIES'},
+                        ],
+                        value='INTERESTS',
+                        clearable=True,
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'background-color': 'black', 'display': 'none'}
+                    )
+                ]),
 
-        # Filter section explore
-        html.Div([
+            ],
+            id='filter-section-network'
+            ),
 
-            # Fiscal Year Dropdown
-            html.Div([
-                html.H2('Fiscal Year:'),
-                dcc.Dropdown(
-                    id='fiscal-year-dropdown',
-                    options=[
-                        {'label': '2021', 'value': 1},
-                        {'label': '2022', 'value': 2},
-                        {'label': '2023', 'value': 3}
-                    ],
-                    clearable=True,
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'background-color': 'black'}
-                )
-            ]),
-
-            # Employee Dropdown
+            # Filter section explore
             html.Div([
-                html.H2('Average Employees:'),
-                dcc.Dropdown(
-                    id='average-employees-dropdown',
-                    options=[
-                        {'label': '>5', 'value': 1},
-                        {'label': '>10', 'value': 2},
-                        {'label': '>50', 'value': 3},
-                        {'label': '>100', 'value': 4}
-                    ],
-                    clearable=True,
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'background-color': 'black'}
-                )
-            ]),
-            # Spending Dropdown
-            html.Div([
-                html.H2('Average Spending:'),
-                dcc.Dropdown(
-                    id='average-spending-dropdown',
-                    options=[
-                        {'label': '>5.000', 'value': 1},
-                        {'label': '>10.000', 'value': 2},
-                        {'label': '>50.000', 'value': 3},
-                        {'label': '>100.000', 'value': 4},
-                        {'label': '>500.000', 'value': 5},
-                        {'label': '>1.000.000', 'value': 6}
-                    ],
-                    clearable=True,
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'background-color': 'black'}
-                )
-            ]),
-            # Spending/Employee Dropdown
-            html.Div([
-                html.H2('Spending/Employee:'),
-                dcc.Dropdown(
-                    id='spending-per-employee-dropdown',
-                    options=[
-                        {'label': '>1.000', 'value': 1},
-                        {'label': '>5.000', 'value': 2},
-                        {'label': '>10.000', 'value': 3},
-                        {'label': '>50.000', 'value': 4},
-                        {'label': '>100.000', 'value': 5}
-                    ],
-                    clearable=True,
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'background-color': 'black'}
-                )
-            ]),
-            # Entity Dropdown
-            html.Div([
-                html.H2('Entity'),
-                dcc.Dropdown(
-                    id='entity-dropdown',
-                    options=[
-                        {'label': i, 'value': i} for i in sorted(cDf['Entity'].unique())
-                    ],
-                    clearable=True,
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'background-color': 'black', 'white-space': 'nowrap', 'text-overflow': 'ellipsis'}
-                )
-            ])
+
+                # Fiscal Year Dropdown
+                html.Div([
+                    html.H2('Fiscal Year:'),
+                    dcc.Dropdown(
+                        id='fiscal-year-dropdown',
+                        options=[
+                            {'label': str(year), 'value': year} for year in data.filterIndex.fiscal_years
+                        ],
+                        clearable=True,
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'background-color': 'black'}
+                    )
+                ]),
+
+                # Employee Dropdown
+                html.Div([
+                    html.H2('Average Employees:'),
+                    dcc.Dropdown(
+                        id='average-employees-dropdown',
+                        options=[
+                            {'label': '>5', 'value': 1},
+                            {'label': '>10', 'value': 2},
+                            {'label': '>50', 'value': 3},
+                            {'label': '>100', 'value': 4}
+                        ],
+                        clearable=True,
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'background-color': 'black'}
+                    )
+                ]),
+                # Spending Dropdown
+                html.Div([
+                    html.H2('Average Spending:'),
+                    dcc.Dropdown(
+                        id='average-spending-dropdown',
+                        options=[
+                            {'label': '>5.000', 'value': 1},
+                            {'label': '>10.000', 'value': 2},
+                            {'label': '>50.000', 'value': 3},
+                            {'label': '>100.000', 'value': 4},
+                            {'label': '>500.000', 'value': 5},
+                            {'label': '>1.000.000', 'value': 6}
+                        ],
+                        clearable=True,
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'background-color': 'black'}
+                    )
+                ]),
+                # Spending/Employee Dropdown
+                html.Div([
+                    html.H2('Spending/Employee:'),
+                    dcc.Dropdown(
+                        id='spending-per-employee-dropdown',
+                        options=[
+                            {'label': '>1.000', 'value': 1},
+                            {'label': '>5.000', 'value': 2},
+                            {'label': '>10.000', 'value': 3},
+                            {'label': '>50.000', 'value': 4},
+                            {'label': '>100.000', 'value': 5}
+                        ],
+                        clearable=True,
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'background-color': 'black'}
+                    )
+                ]),
+                # Entity Dropdown
+                html.Div([
+                    html.H2('Entity'),
+                    dcc.Dropdown(
+                        id='entity-dropdown',
+                        options=[
+                            {'label': i, 'value': i} for i in sorted(data.cDf['Entity'].unique())
+                        ],
+                        clearable=True,
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'background-color': 'black', 'white-space': 'nowrap', 'text-overflow': 'ellipsis'}
+                    )
+                ])
+            ], 
+            id='filter-section-explore',
+            ),
         ], 
-        id='filter-section-explore',
-        ),
-    ], 
-    style={'width': 340, 'margin-top': 30, 'margin-right': 5, 'margin-left': 15}),
+        style={'width': 340, 'margin-top': 30, 'margin-right': 5, 'margin-left': 15}),
 
 
-    # -------------------------------------- Insights Tab --------------------------------------
+        # -------------------------------------- Insights Tab --------------------------------------
 
-    # Insights container
-    html.Div([
+        # Insights container
+        html.Div([
 
-        # -------------------------------------- Interests Chapter
-        html.Div(
-        [
-            #Left Column
-            dbc.Col(
+            # -------------------------------------- Interests Chapter
+            html.Div(
             [
-                #First Row
-                dbc.Row(
-                    html.Div(
-                        #Mean/Median Interests
-                        dcc.Graph(figure=figAverageInterests)
-                    )
+                #Left Column
+                dbc.Col(
+                [
+                    #First Row
+                    dbc.Row(
+                        html.Div(
+                            #Mean/Median Interests
+                            figureGraph('average-interests')
+                        )
+                    ),
+                    #Second Row
+                    dbc.Row(
+                        html.Div(
+                            #Biggest interests areas
+                            figureGraph('biggest-interest-areas')
+                        )
+                    ),
+                ]
                 ),
-                #Second Row
-                dbc.Row(
+                #Right Column
+                dbc.Col(
                     html.Div(
-                        #Biggest interests areas
-                        dcc.Graph(figure=figBiggestInterestAreas)
+                        #Unique Interests 
+                        figureGraph('unique-interests')
                     )
                 ),
-            ]
-            ),
-            #Right Column
-            dbc.Col(
-                html.Div(
-                    #Unique Interests 
-                    dcc.Graph(figure=figUniqueInterests)
-                )
+            ],
+            id='insights-interests',
             ),
-        ],
-        id='insights-interests',
-        ),
 
-        # -------------------------------------- Spendings Chapter
-        html.Div(
-        [
-            #Left Column
-            dbc.Col(
+            # -------------------------------------- Spendings Chapter
+            html.Div(
             [
-                #First Row
-                dbc.Row(
-                    html.Div(
-                        #Spendings per employee
-                        dcc.Graph(figure=figSpendingPerEmployee)
-                    )
-                ),
-                #Second Row
-                dbc.Row(
-                    html.Div(
-                        #Sepndings Scatter
-                        dcc.Graph(figure=figSpendingsScatter)
-                    )
+                #Left Column
+                dbc.Col(
+                [
+                    #First Row
+                    dbc.Row(
+                        html.Div(
+                            #Spendings per employee
+                            figureGraph('spending-per-employee')
+                        )
+                    ),
+                    #Second Row
+                    dbc.Row(
+                        html.Div(
+                            #Sepndings Scatter
+                            figureGraph('spendings-scatter')
+                        )
+                    ),
+                ]
                 ),
-            ]
+                #Right Column
+                dbc.Col([
+                    dbc.Row(
+                        html.Div(
+                            #Spendings Pie 
+                            figureGraph('spendings-pie')
+                        )
+                    ),
+                    dbc.Row(
+                        html.Div(
+                            #Spendings Pie 
+                            figureGraph('employees-pie')
+                        )
+                    ),
+                ]),
+            ],
+            id='insights-spendings',
             ),
-            #Right Column
-            dbc.Col([
-                dbc.Row(
-                    html.Div(
-                        #Spendings Pie 
-                        dcc.Graph(figure=figSpendingsPie)
-                    )
-                ),
-                dbc.Row(
+
+            # -------------------------------------- Entities 1 Chapter
+            html.Div(
+                [
                     html.Div(
-                        #Spendings Pie 
-                        dcc.Graph(figure=figEmployeePie)
+                        #Number of entities
+                        figureGraph('number-of-entities')
+                    ),
+                    html.Div(                        #Average Employees
+                        figureGraph('average-employees')
                     )
-                ),
-            ]),
-        ],
-        id='insights-spendings',
-        ),
-
-        # -------------------------------------- Entities 1 Chapter
-        html.Div(
-            [
-                html.Div(
-                    #Number of entities
-                    dcc.Graph(figure=figNumberOfEntities)
-                ),
-                html.Div(                        #Average Employees
-                    dcc.Graph(figure=figAverageEmployees)
-                )
-        ],
-        id='insights-entities-1',
-        ),
+            ],
+            id='insights-entities-1',
+            ),
 
-        # -------------------------------------- Entities 2 Chapter
-        html.Div(
-        [           
+            # -------------------------------------- Entities 2 Chapter
             html.Div(
-                #Interests per Entity
-                dcc.Graph(figure=figInterestsPerEntity)
-            )            
-        ],
-        id='insights-entities-2',
-        ),
+            [           
+                html.Div(
+                    #Interests per Entity
+                    figureGraph('interests-per-entity')
+                )            
+            ],
+            id='insights-entities-2',
+            ),
 
-    ],
-    id='insights-tab',
-    style={
-            'display': 'none',
-            'width': 'auto', 
-            'margin-top': 50,
-            'margin-right': 25,
-            'margin-bottom': 25,
-        }
-    ),
-
-
-    # -------------------------------------- Explore Tab --------------------------------------
-    # Explore Tab container
-    html.Div([
-        html.Div([ 
-            html.H2('Column Filter:'),
-                # Column filtering
-                # Original Dataset Dropdown
-                dcc.Dropdown(
-                    id='column-dropdown-filter-original',
-                    options=[{'label': col, 'value': col} for col in sorted(oDf.columns)],
-                    clearable=True,
-                    multi=True,
-                    value=[oDf.columns[0],   # Name
-                           oDf.columns[7],   # Spending
-                           oDf.columns[8],   # Fiscal Year
-                           oDf.columns[4],   # Entity
-                           oDf.columns[13],  # Employees
-                           oDf.columns[5]],  # Interests]
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'display':'none', 'background-color': 'black'}
-                ),
-                # Clean Dataset Dropdown
-                dcc.Dropdown(
-                    id='column-dropdown-filter-cleaned',
-                    options=[{'label': col, 'value': col} for col in sorted(cDf.columns)],
-                    clearable=True,
-                    multi=True,
-                    value=[cDf.columns[0],   # Name
-                           cDf.columns[18],  # AVG Spending
-                           cDf.columns[21],  # Fiscal Year
-                           cDf.columns[4],   # Entity
-                           cDf.columns[22]], # Average/Employee 
-                    optionHeight=40,
-                    className='customDropdown',
-                    style={'display':'none', 'background-color': 'black'}
-                ),
-                # Tabs for switching tables
-                html.Div([
-                dcc.Tabs(
-                    id='table-tabs', 
-                    value='cleaned-tab', 
-                    children=[
-                        dcc.Tab(
-                            label='Cleaned Dataset', 
-                            value='cleaned-tab',
-                            style={'backgroundColor': 'black',
-                                   'color': 'white',
-                                   'border-top':'0px',
-                                   'border-left':'0px',                 
-                                   'border-right':'0px',                 
-                                   'border-bottom':'0px'},
-                            selected_style={'backgroundColor': 'black', 
-                                            'color': '#3498db',
-                                            'border-top':'0px',
-                                            'border-left':'0px',                 
-                                            'border-right':'0px',                 
-                                            'border-bottom':'0px'},
-                            ),
-                        dcc.Tab(
-                            label='Original Dataset', 
-                            value='original-tab',
-                            style={'backgroundColor': 'black',
-                                   'color': 'white',
-                                   'border-top':'0px',
-                                   'border-left':'0px',                 
-                                   'border-right':'0px',                 
-                                   'border-bottom':'0px'},
-                            selected_style={'backgroundColor': 'black', 
-                                            'color': '#3498db',
-                                            'border-top':'0px',
-                                            'border-left':'0px',                 
-                                            'border-right':'0px',                 
-                                            'border-bottom':'0px'},
-                            )
-                ]),
-                html.Div(id='table-tabs-content')
-                ],
-                style={'margin-top': 15}),
-                # Display data tables
-                ],
-                # Style for the tables
-                style={'width': 990, 'margin-top': 63}),
         ],
-        id='explore-tab',
+        id='insights-tab',
         style={
-            'display': 'none',
-            'width': 'auto', 
-            'margin-top': 50,
-            'margin-right': 25,
-            'margin-bottom': 25,
-        }),
+                'display': 'none',
+                'width': 'auto', 
+                'margin-top': 50,
+                'margin-right': 25,
+                'margin-bottom': 25,
+            }
+        ),
 
 
-    # -------------------------------------- Network Tab --------------------------------------
+        # -------------------------------------- Explore Tab --------------------------------------
+        # Explore Tab container
+        html.Div([
+            html.Div([ 
+                html.H2('Column Filter:'),
+                    # Column filtering
+                    # Original Dataset Dropdown
+                    dcc.Dropdown(
+                        id='column-dropdown-filter-original',
+                        options=[{'label': col, 'value': col} for col in sorted(data.oDf.columns)],
+                        clearable=True,
+                        multi=True,
+                        value=[data.oDf.columns[0],   # Name
+                               data.oDf.columns[7],   # Spending
+                               data.oDf.columns[8],   # Fiscal Year
+                               data.oDf.columns[4],   # Entity
+                               data.oDf.columns[13],  # Employees
+                               data.oDf.columns[5]],  # Interests]
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'display':'none', 'background-color': 'black'}
+                    ),
+                    # Clean Dataset Dropdown
+                    dcc.Dropdown(
+                        id='column-dropdown-filter-cleaned',
+                        options=[{'label': col, 'value': col} for col in sorted(data.cDf.columns)],
+                        clearable=True,
+                        multi=True,
+                        value=[data.cDf.columns[0],   # Name
+                               data.cDf.columns[18],  # AVG Spending
+                               data.cDf.columns[21],  # Fiscal Year
+                               data.cDf.columns[4],   # Entity
+                               data.cDf.columns[22]], # Average/Employee 
+                        optionHeight=40,
+                        className='customDropdown',
+                        style={'display':'none', 'background-color': 'black'}
+                    ),
+                    # Tabs for switching tables
+                    html.Div([
+                    dcc.Tabs(
+                        id='table-tabs', 
+                        value='cleaned-tab', 
+                        children=[
+                            dcc.Tab(
+                                label='Cleaned Dataset', 
+                                value='cleaned-tab',
+                                style={'backgroundColor': 'black',
+                                       'color': 'white',
+                                       'border-top':'0px',
+                                       'border-left':'0px',                 
+                                       'border-right':'0px',                 
+                                       'border-bottom':'0px'},
+                                selected_style={'backgroundColor': 'black', 
+                                                'color': '#3498db',
+                                                'border-top':'0px',
+                                                'border-left':'0px',                 
+                                                'border-right':'0px',                 
+                                                'border-bottom':'0px'},
+                                ),
+                            dcc.Tab(
+                                label='Original Dataset', 
+                                value='original-tab',
+                                style={'backgroundColor': 'black',
+                                       'color': 'white',
+                                       'border-top':'0px',
+                                       'border-left':'0px',                 
+                                       'border-right':'0px',                 
+                                       'border-bottom':'0px'},
+                                selected_style={'backgroundColor': 'black', 
+                                                'color': '#3498db',
+                                                'border-top':'0px',
+                                                'border-left':'0px',                 
+                                                'border-right':'0px',                 
+                                                'border-bottom':'0px'},
+                                )
+                    ]),
+                    html.Div(id='table-tabs-content')
+                    ],
+                    style={'margin-top': 15}),
+                    # Display data tables
+                    ],
+                    # Style for the tables
+                    style={'width': 990, 'margin-top': 63}),
+            ],
+            id='explore-tab',
+            style={
+                'display': 'none',
+                'width': 'auto', 
+                'margin-top': 50,
+                'margin-right': 25,
+                'margin-bottom': 25,
+            }),
+
+
+        # -------------------------------------- Network Tab --------------------------------------
+
+        # Insights container
+        html.Div([
 
-    # Insights container
-    html.Div([
+            html.Div(
+            [
+                html.Div(figureGraph('network-interests'))
+            ],
+            id='network-interests',
+            style={
+                'width': 'auto', 
+                'margin-top': 50,
+                'margin-right': 25,
+                'margin-bottom': 25,
+            }), 
 
-        html.Div(
-        [
-            html.Div(dcc.Graph(figure=networkFigureInterests))
-        ],
-        id='network-interests',
-        style={
-            'width': 'auto', 
-            'margin-top': 50,
-            'margin-right': 25,
-            'margin-bottom': 25,
-        }), 
-
-        html.Div(
-        [
-            html.Div(dcc.Graph(figure=networkFigureEntities))
+            html.Div(
+            [
+                html.Div(figureGraph('network-entities'))
+            ],
+            id='network-entities',
+            style={
+                'width': 'auto', 
+                'margin-top': 50,
+                'margin-right': 25,
+                'margin-bottom': 25,
+            })
         ],
-        id='network-entities',
-        style={
-            'width': 'auto', 
-            'margin-top': 50,
-            'margin-right': 25,
-            'margin-bottom': 25,
-        })
+        id='network-tab',
+            style={
+                'display': 'none',
+                'width': 'auto', 
+                'margin-top': 50,
+                'margin-right': 25,
+                'margin-bottom': 25,
+            }
+        ),
+
     ],
-    id='network-tab',
-        style={
-            'display': 'none',
-            'width': 'auto', 
-            'margin-top': 50,
-            'margin-right': 25,
-            'margin-bottom': 25,
-        }
-    ),
+        # Style for the dash container
+        fluid=True,
+        style={'display': 'flex', 'background':'black'},
+        className='dashboard-container')
 
-],
-    # Style for the dash container
-    fluid=True,
-    style={'display': 'flex', 'background':'black'},
-    className='dashboard-container')
+app.layout = serveLayout
 
 
 #-------------------------------------- CALLBACKS -------------------------------------
@@ -656,6 +675,17 @@ def update_chapter_visibility(selected_chapter):
     # Return updated styles for each chapter    
     return interests_style, spendings_style, entities_1_style, entities_2_style, interests_style_text, spendings_style_text, entities_style_text  
 
+# Send the figures of the selected insights chapter, they are built on first access
+@app.callback(
+    [Output(f'{name}-graph', 'figure') for name in insightsFigures],
+    [Input('insights-chapter-dropdown', 'value'),
+     Input('radio-button-group', 'value')]
+)
+def update_insights_figures(selected_chapter, selected_tab):
+    selected = insightsChapterFigures.get(selected_chapter, []) if selected_tab == 'INSIGHTS' else []
+    figures = current.figures
+    return [figures.get(name) if name in selected else no_update for name in insightsFigures]
+
 # -------------------------------------- Explore --------------------------------------    
 
 # Define callback to toggle explore tab visibility
@@ -672,6 +702,10 @@ def toggle_explore_tab_visibility(selected_tab):
     else:
         return ({'display': 'none'}, {'display': 'none'}) # Change to 'none' to hide it
     
+# Message below a table when its filter query can not be applied
+def filterError(table):
+    return html.Div(id=f'{table}-filter-error', style={'color': '#e74c3c', 'margin-top': 10})
+
 # Table Tabs 
 
 @app.callback(
@@ -683,35 +717,45 @@ def toggle_explore_tab_visibility(selected_tab):
 
 def render_content(tab):
     if tab == 'cleaned-tab':
-        return dash_table.DataTable(
+        return [dash_table.DataTable(
                     id='cleaned-data-table',
-                    columns=[{'name': i, 'id': i, 'deletable': True} for i in sorted(cDf.columns)],
+                    columns=[{'name': i, 'id': i, 'deletable': True} for i in sorted(current.cDf.columns)],
                     sort_by=[],
-                    filter_action='native',
-                    sort_action='native',
+                    filter_action='custom',
+                    filter_query='',
+                    sort_action='custom',
+                    sort_mode='single',
+                    page_action='custom',
+                    page_current=0,
+                    page_size=PAGE_SIZE,
                     style_data={
                     'overflow': 'ellipsis',
                     },
                     style_table={'overflowX': 'auto', 'overflowY': 'auto', 'height': 511},
                     style_header={'backgroundColor': 'black','color': '#3498db','fontWeight': 'bold', 'fontFamily': 'sans-serif'},
                     style_cell={'backgroundColor': 'black','color': 'white','textAlign': 'left', 'fontFamily': 'sans-serif'},
-                ), {'display':'block', 'background-color': 'black'}, {'display':'none', 'background-color': 'black'}
+                ), filterError('cleaned-data-table')], {'display':'block', 'background-color': 'black'}, {'display':'none', 'background-color': 'black'}
     
     elif tab == 'original-tab':
-        return dash_table.DataTable(
+        return [dash_table.DataTable(
                     id='original-data-table',
-                    columns=[{'name': i, 'id': i, 'deletable': True} for i in sorted(oDf.columns)],
+                    columns=[{'name': i, 'id': i, 'deletable': True} for i in sorted(current.oDf.columns)],
                     sort_by=[],
-                    filter_action='native',
-                    sort_action='native',
+                    filter_action='custom',
+                    filter_query='',
+                    sort_action='custom',
+                    sort_mode='single',
+                    page_action='custom',
+                    page_current=0,
+                    page_size=PAGE_SIZE,
                     style_data={
-                    'width': '{}%'.format(100. / len(oDf.columns)),
+                    'width': '{}%'.format(100. / len(current.oDf.columns)),
                     'textOverflow': 'hidden'
                     },
                     style_table={'overflowX': 'auto', 'overflowY': 'auto', 'height': 511},
                     style_header={'backgroundColor': 'black','color': '#3498db','fontWeight': 'bold', 'fontFamily': 'sans-serif'},
                     style_cell={'backgroundColor': 'black','color': 'white','textAlign': 'left', 'fontFamily': 'sans-serif'},
-                ), {'display':'none', 'background-color': 'black'}, {'display':'block', 'background-color': 'black'}
+                ), filterError('original-data-table')], {'display':'none', 'background-color': 'black'}, {'display':'block', 'background-color': 'black'}
     
 # -------------------------------------- Network --------------------------------------
 
@@ -756,28 +800,70 @@ def update_chapter_visibility(selected_chapter):
     return interests_style, entities_style # Return updated styles for each chapter 
 
 
+# Send the figure of the selected network chapter, the layout is only computed when the network is opened
+@app.callback(
+    [Output(f'{name}-graph', 'figure') for name in networkFigures],
+    [Input('network-chapter-dropdown', 'value'),
+     Input('radio-button-group', 'value')]
+)
+def update_network_figures(selected_chapter, selected_tab):
+    selected = networkChapterFigures.get(selected_chapter, []) if selected_tab == 'NETWORK' else []
+    figures = current.figures
+    return [figures.get(name) if name in selected else no_update for name in networkFigures]
+
+
 # -------------------------------------- Update Original Datatable --------------------------------------
 
-# Define callback to update table
+# Table rows from the cache, a filter query that can not be applied keeps the table as it is and shows why
+def tableResponse(key, compute):
+    try:
+        return (*tableCache.get_or_compute(key, compute), '')
+    except FilterQueryError as error:
+        return no_update, no_update, no_update, no_update, str(error)
+
+# True when the table callback was only triggered by paging (page_current or page_size), the page is kept then
+def pagingOnly():
+    return all(prop.endswith(('.page_current', '.page_size')) for prop in ctx.triggered_prop_ids)
+
+# Define callback to update table, only the requested page is sent to the browser
 @app.callback(
     [Output('original-data-table', 'data'),
-    Output('original-data-table', 'columns')], # Update columns dynamically
-    [Input('column-dropdown-filter-original', 'value')] # Update table based on selected columns
+    Output('original-data-table', 'columns'), # Update columns dynamically
+    Output('original-data-table', 'page_count'),
+    Output('original-data-table', 'page_current'),
+    Output('original-data-table-filter-error', 'children')],
+    [Input('column-dropdown-filter-original', 'value'), # Update table based on selected columns
+    Input('original-data-table', 'page_current'),
+    Input('original-data-table', 'page_size'),
+    Input('original-data-table', 'sort_by'),
+    Input('original-data-table', 'filter_query')]
 )
 
 # Update table
-def update_table(selected_columns):
+def update_original_table(selected_columns, page_current, page_size, sort_by, filter_query):
+    # Start on the first page when the columns, the sorting or the filter change
+    if not pagingOnly():
+        page_current = 0
+
+    # The whole request is answered from one dataset version
+    data = current
+
     # Filter DataFrame based on selected columns
-    if selected_columns:
-        oDff = oDf[selected_columns]
-    else:
-        oDff = oDf.copy()
+    selected_columns = selected_columns or list(data.oDf.columns)
 
-    # Prepare columns for the DataTable
-    columns = [{'name': i, 'id': i} for i in selected_columns] if selected_columns else [{'name': i, 'id': i} for i in oDf.columns]
-    
-    # Return data and columns
-    return oDff.to_dict('records'), columns
+    # Filter, sort and page the table
+    def compute():
+        rows, page_count, page_shown = query_table(data.oDf, selected_columns, page_current, page_size, sort_by, filter_query)
+
+        # Prepare columns for the DataTable
+        columns = [{'name': i, 'id': i} for i in selected_columns]
+
+        # Return data and columns
+        return rows, columns, page_count, page_shown
+
+    # Popular views are answered from the cache
+    key = cache_key('original', data.datasetVersion, selected_columns, page_current, page_size, sort_by, filter_query)
+    return tableResponse(key, compute)
 
 
 # -------------------------------------- Update Cleanded Datatable ----------------------------------
@@ -786,80 +872,58 @@ def update_table(selected_columns):
 
 @app.callback(
     [Output('cleaned-data-table', 'data'),
-    Output('cleaned-data-table', 'columns')], # Update columns dynamically
+    Output('cleaned-data-table', 'columns'), # Update columns dynamically
+    Output('cleaned-data-table', 'page_count'),
+    Output('cleaned-data-table', 'page_current'),
+    Output('cleaned-data-table-filter-error', 'children')],
     [
     Input('column-dropdown-filter-cleaned', 'value'),
     Input('fiscal-year-dropdown', 'value'),
     Input('average-employees-dropdown', 'value'),
     Input('average-spending-dropdown', 'value'),
     Input('spending-per-employee-dropdown', 'value'),
-    Input('entity-dropdown', 'value')] # Update table based on selected columns
+    Input('entity-dropdown', 'value'), # Update table based on selected columns
+    Input('cleaned-data-table', 'page_current'),
+    Input('cleaned-data-table', 'page_size'),
+    Input('cleaned-data-table', 'sort_by'),
+    Input('cleaned-data-table', 'filter_query')]
 )
-def update_table(selected_columns, selected_year, selected_employees, selected_spending, selected_spending_per_employee, selected_entity):
-    filtered_df = cDf.copy() 
-    
-    # Filter by year
-    if selected_year:
-        year_mapping = {1: 2021, 2: 2022, 3: 2023}
-        filtered_df = filtered_df[filtered_df['Fiscal Year Start'].dt.year == year_mapping[selected_year]]
-    
-    # Filter by average employees
-    if selected_employees:
-        if selected_employees == 1:
-            filtered_df = filtered_df[filtered_df['Ø Employees'] > 5]
-        elif selected_employees == 2:
-            filtered_df = filtered_df[filtered_df['Ø Employees'] > 10]
-        elif selected_employees == 3:
-            filtered_df = filtered_df[filtered_df['Ø Employees'] > 50]
-        elif selected_employees == 4:
-            filtered_df = filtered_df[filtered_df['Ø Employees'] > 100]
-    
-    # Filter by average spending
-    if selected_spending:
-        if selected_spending == 1:
-            filtered_df = filtered_df[filtered_df['Ø Amount'] > 5000]
-        elif selected_spending == 2:
-            filtered_df = filtered_df[filtered_df['Ø Amount'] > 10000]
-        elif selected_spending == 3:
-            filtered_df = filtered_df[filtered_df['Ø Amount'] > 50000]
-        elif selected_spending == 4:
-            filtered_df = filtered_df[filtered_df['Ø Amount'] > 100000]
-        elif selected_spending == 5:
-            filtered_df = filtered_df[filtered_df['Ø Amount'] > 500000]
-        elif selected_spending == 6:
-            filtered_df = filtered_df[filtered_df['Ø Amount'] > 1000000]
-
-    # Filter by spending per employee
-    if selected_spending_per_employee:
-        if selected_spending_per_employee == 1:
-            filtered_df = filtered_df[filtered_df['Ø Amount/Employee'] > 1000]
-        elif selected_spending_per_employee == 2:
-            filtered_df = filtered_df[filtered_df['Ø Amount/Employee'] > 5000]
-        elif selected_spending_per_employee == 3:
-            filtered_df = filtered_df[filtered_df['Ø Amount/Employee'] > 10000]
-        elif selected_spending_per_employee == 4:
-            filtered_df = filtered_df[filtered_df['Ø Amount/Employee'] > 50000]
-        elif selected_spending_per_employee == 5:
-            filtered_df = filtered_df[filtered_df['Ø Amount/Employee'] > 100000]
-        
-
-    # Filter by selected entity
-    if selected_entity:
-        # Ensure selected_entity is treated as a list
-        entity_list = [selected_entity] if isinstance(selected_entity, str) else selected_entity
-        filtered_df = filtered_df[filtered_df['Entity'].isin(entity_list)]
+def update_cleaned_table(selected_columns, selected_year, selected_employees, selected_spending, selected_spending_per_employee, selected_entity, page_current, page_size, sort_by, filter_query):
+    # Start on the first page when a filter dropdown, the columns, the sorting or the filter query change
+    if not pagingOnly():
+        page_current = 0
 
-    # Filter DataFrame based on selected columns
-    if selected_columns:
-        cDff = filtered_df[selected_columns]
-    else:
-        cDff = filtered_df.copy()
+    # The whole request is answered from one dataset version
+    data = current
 
-    # Prepare columns for the DataTable
-    columns = [{'name': i, 'id': i} for i in selected_columns] if selected_columns else [{'name': i, 'id': i} for i in filtered_df.columns]
-    
-    # Return data and columns
-    return cDff.to_dict('records'), columns
+    selected_columns = selected_columns or list(data.cDf.columns)
+
+    def compute():
+        # Rows matching the fiscal year, average employees, average spending, spending per employee and entity dropdowns
+        rows = data.filterIndex.select(selected_year, selected_employees, selected_spending, selected_spending_per_employee, selected_entity)
+
+        # Filter DataFrame based on selected columns, only the selected rows and columns are copied
+        filtered_df = data.filterIndex.take(rows, selected_columns)
+
+        # Filter, sort and page the table
+        page, page_count, page_shown = query_table(filtered_df, selected_columns, page_current, page_size, sort_by, filter_query)
+
+        # Prepare columns for the DataTable
+        columns = [{'name': i, 'id': i} for i in selected_columns]
+
+        # Return data and columns
+        return page, columns, page_count, page_shown
+
+    # Popular views (e.g. "Unternehmen, 2023") are answered from the cache
+    key = cache_key('cleaned', data.datasetVersion, selected_columns, selected_year, selected_employees, selected_spending,
+                    selected_spending_per_employee, selected_entity, page_current, page_size, sort_by, filter_query)
+    return tableResponse(key, compute)
+
+
+# Hit and miss counters of the explore table cache
+@server.route('/table-cache-stats')
+def table_cache_stats():
+    return jsonify(tableCache.stats())
 
 
 # -------------------------------------- About Modal --------------------------------------
@@ -875,8 +939,78 @@ def toggle_modal(n1, n2, is_open):
     return is_open
 
 
+# -------------------------------------- Dataset Reload --------------------------------------
+
+# Build everything for a new version of the datasets next to the current one, then swap it in.
+# Requests in flight keep the old version, its figures keep being built from the old registry.
+def applyDatasetReload(staged):
+    global current
+
+    # The old version is still served until the swap, but no longer stores figures on disk
+    current.figures.retire()
+    data = DashboardData(staged)
+    if FIGURE_WARMUP:
+        data.figures.warm_up()
+    current = data
+
+    # Responses and derived frames of the old version are not requested anymore, the cached frames
+    # would keep the old datasets in memory
+    tableCache.clear()
+    datasetPreprocessingInsights.clear_caches()
+
+# Watches the dataset files (DATASET_RELOAD_INTERVAL seconds, 0 disables it) and the reload trigger.
+# The watcher runs in the process that owns the datasets, the development server or the master of
+# productionServer.py. Without a watcher (e.g. plain gunicorn) triggered reloads are not applied.
+reloader = DatasetReloader(datasets, applyDatasetReload)
+
+# Token of the reload endpoints (RELOAD_TOKEN), without a token they are disabled
+reloadToken = os.environ.get('RELOAD_TOKEN', '')
+
+def reloadAuthorized():
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    return bool(reloadToken) and hmac.compare_digest(token.encode(), reloadToken.encode())
+
+# Reload the datasets without a restart, e.g. curl -X POST -H "Authorization: Bearer $RELOAD_TOKEN" .../admin/reload.
+# The request only writes the reload trigger, the watcher reloads for all worker processes. Triggers while
+# a reload runs are combined into a single reload afterwards.
+@server.route('/admin/reload', methods=['POST'])
+def reload_datasets():
+    if not reloadAuthorized():
+        return jsonify({'error': 'forbidden'}), 403
+    reloader.request_reload(force=request.args.get('force') == '1')
+    return jsonify({'reloading': True}), 202
+
+# Reload counter, last error and the versions of the watching process, and the version this worker serves
+@server.route('/admin/reload-status')
+def reload_status():
+    if not reloadAuthorized():
+        return jsonify({'error': 'forbidden'}), 403
+    return jsonify({**reloader.shared_status(), 'served': {'pid': os.getpid(), 'version': current.datasetVersion}})
+
+
+# -------------------------------------- Readiness --------------------------------------
+
+# Servers that only import the app (e.g. plain gunicorn --preload) do not start the warm-up,
+# the first request of every worker process does
+@server.before_request
+def start_figure_warm_up():
+    if FIGURE_WARMUP:
+        current.figures.start_warm_up(delay=0)
+
+# The datasets are loaded at import, the app is ready once the figures are built (or the warm-up is disabled)
+@server.route('/ready')
+def ready():
+    if current.figures.warmed_up.is_set() or not FIGURE_WARMUP:
+        return jsonify({'ready': True, 'pid': os.getpid()})
+    return jsonify({'ready': False, 'pid': os.getpid()}), 503
+
+
 # -------------------------------------- Run the app --------------------------------------
 
-# Run the app on port 8050
+# Run the app on port 8050 with the development server, use productionServer.py for multiple workers
 if __name__ == "__main__":
+    # Build the remaining figures in the background once the server is listening
+    if FIGURE_WARMUP:
+        current.figures.start_warm_up()
+    reloader.start_watching()
     app.run_server(debug=False, host="0.0.0.0", port=8050)
@@ -0,0 +1,264 @@
+# Benchmarks for the dataset preprocessing, the insights and network figures and the table callbacks.
+# Every case runs on the register repeated 1x, 10x and 100x and records the best wall time and the
+# peak memory (tracemalloc, measured in a separate run). Results can be stored as a baseline and later
+# runs are compared against it.
+#
+# Run with:  python benchmark.py
+#            python benchmark.py --save-baseline          (store the results as the baseline)
+#            python benchmark.py --scales 1 10 --cases table
+#            python benchmark.py --scales 1 --register Datasets/synthetic/Lobbyregister_synthetic.csv \
+#                                --cleaned-register Datasets/synthetic/cleanedLobbyregister_synthetic.csv
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+import pandas as pd
+
+from datasetDtypes import CLEANED_SCHEMA, ORIGINAL_SCHEMA, compact_frame
+from datasetPreprocessingExplore import parse_fiscal_years, preprocess_dataset
+from datasetRegistry import datasets
+
+filepath = 'Datasets/Lobbyregister2024_full.csv'
+cleaned_filepath = 'Datasets/cleanedLobbyregister2024.csv'
+
+# Results of a previous run, machine specific and therefore not versioned
+BASELINE_PATH = 'Datasets/cache/benchmark_baseline.json'
+
+# Slower than the baseline by more than this factor and by more than REGRESSION_FLOOR seconds is reported
+# as a regression. Cases of a few milliseconds vary by more than the factor from run to run.
+REGRESSION_THRESHOLD = 1.25
+REGRESSION_FLOOR = 0.05
+
+# Figure builders of the insights pages
+FIGURE_BUILDERS = ['createFigUniqueInterests', 'createFigAverageInterests', 'createFigBiggestInterestAreas',
+                   'createFigEmployeesPie', 'createFigSpendingsPie', 'createFigSpendingsScatter',
+                   'createFigSpendingsPerEmployee', 'createFigNumberOfEntities', 'createFigAverageEmployees',
+                   'createFigInterestPerEntity']
+
+
+# Repeat a column until it has `scale` times as many rows
+def scale_series(series, scale):
+    return pd.concat([series] * scale, ignore_index=True)
+
+
+# Repeat a frame until it has `scale` times as many rows
+def scale_frame(df, scale):
+    return pd.concat([df] * scale, ignore_index=True)
+
+
+# Best wall time of `repeat` runs
+def best_time(function, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# Peak memory allocated by Python during a single run, in bytes
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# -------------------------------------- Data --------------------------------------
+
+# Raw register, read once
+def raw_register():
+    if not hasattr(raw_register, 'df'):
+        raw_register.df = pd.read_csv(filepath)
+    return raw_register.df
+
+
+# Scale the datasets of the registry, caches of derived frames are cleared
+def use_scale(scale):
+    cleaned = pd.read_csv(cleaned_filepath)
+    datasets.set('cleaned', scale_frame(cleaned, scale))
+    clear_insights_caches()
+
+    original = raw_register().copy()
+    original[' index'] = range(1, len(original) + 1)
+    datasets.set('original', compact_frame(scale_frame(original, scale), ORIGINAL_SCHEMA))
+    datasets.set('explore', compact_frame(scale_frame(preprocess_dataset(raw_register()), scale), CLEANED_SCHEMA))
+
+
+def clear_insights_caches():
+    import datasetPreprocessingInsights
+
+    datasetPreprocessingInsights.clear_caches()
+
+
+# -------------------------------------- Cases --------------------------------------
+
+# Each case yields (name, rows, function to time) for the datasets of the current scale
+
+def fiscal_year_cases(scale):
+    series = scale_series(raw_register()['Geschäftsjahr'], scale)
+    yield 'parse_fiscal_years', len(series), lambda: parse_fiscal_years(series)
+
+
+def preprocessing_cases(scale):
+    raw = scale_frame(raw_register(), scale)
+    yield 'preprocess_dataset', len(raw), lambda: preprocess_dataset(raw)
+
+
+def insights_cases(scale):
+    import datasetPreprocessingInsights
+
+    rows = len(datasets.get('cleaned'))
+
+    def tig():
+        clear_insights_caches()
+        datasetPreprocessingInsights.dfTIG()
+
+    def entities():
+        clear_insights_caches()
+        datasetPreprocessingInsights.dfEntities(0)
+
+    yield 'dfTIG', rows, tig
+    yield 'dfEntities', rows, entities
+
+    # Figures are timed with the frames they share already built
+    for name in FIGURE_BUILDERS:
+        builder = getattr(datasetPreprocessingInsights, name)
+        yield name, rows, builder
+
+
+def network_cases(scale):
+    import graphNetwork
+    from networkLayout import compute_layout
+
+    rows = len(datasets.get('cleaned'))
+
+    # The graphs are built from the frames of the insights cases, the layout is computed without the layout cache
+    yield 'createNetworkInterests + layout', rows, lambda: compute_layout(graphNetwork.createNetworkInterests())
+    yield 'createNetworkEntities + layout', rows, lambda: compute_layout(graphNetwork.createNetworkEntities())
+
+
+def table_cases(scale):
+    import app
+
+    app.current = app.DashboardData(datasets)
+
+    client = app.server.test_client()
+    dependencies = client.get('/_dash-dependencies').json
+
+    # Request of a callback through the Dash dispatcher, like the browser sends it (without the network)
+    def request(table, values):
+        dependency = next(d for d in dependencies if d['output'].startswith(f'..{table}.data'))
+        outputs = [dict(zip(['id', 'property'], output.rsplit('.', 1))) for output in dependency['output'][2:-2].split('...')]
+        inputs = [dict(item, value=value) for item, value in zip(dependency['inputs'], values)]
+        body = {'output': dependency['output'], 'outputs': outputs, 'inputs': inputs, 'state': [],
+                'changedPropIds': [f'{table}.page_current']}
+
+        def call():
+            response = client.post('/_dash-update-component', json=body)
+            assert response.status_code == 200, response.status_code
+        return call
+
+    sort_by = [{'column_id': 'Name', 'direction': 'desc'}]
+    original = request('original-data-table', [None, 3, 100, sort_by, '{Betrag} icontains "euro"'])
+    cleaned = request('cleaned-data-table', [None, 2023, None, 2, None, ['Unternehmen', 'Verband'], 1, 100, sort_by, '{Name} icontains gmbh'])
+
+    def uncached(call):
+        def run():
+            app.tableCache.clear()
+            call()
+        return run
+
+    yield 'update_original_table', len(app.current.oDf), uncached(original)
+    yield 'update_cleaned_table', len(app.current.cDf), uncached(cleaned)
+
+    # Answered from the table cache
+    original()
+    cleaned()
+    yield 'update_original_table (cached)', len(app.current.oDf), original
+    yield 'update_cleaned_table (cached)', len(app.current.cDf), cleaned
+
+
+CASES = {
+    'fiscal-years': fiscal_year_cases,
+    'preprocessing': preprocessing_cases,
+    'insights': insights_cases,
+    'network': network_cases,
+    'table': table_cases,
+}
+
+
+# -------------------------------------- Runner --------------------------------------
+
+# Results on other registers are stored under their own names, e.g. "dfTIG x1 [Lobbyregister_synthetic.csv]"
+def run(cases, scales, repeat):
+    register = '' if filepath == datasets.source('original') else f' [{os.path.basename(filepath)}]'
+    results = {}
+    for scale in scales:
+        use_scale(scale)
+        for case in cases:
+            for name, rows, function in CASES[case](scale):
+                seconds = best_time(function, repeat)
+                peak = peak_memory(function)
+                results[f'{name} x{scale}{register}'] = {'rows': rows, 'seconds': seconds, 'peak_mb': peak / 1e6}
+    return results
+
+
+def report(results, baseline):
+    print(f'{"case":<45} {"rows":>10} {"seconds":>10} {"peak MB":>10} {"baseline":>10} {"change":>8}')
+    regressions = []
+    for name, result in results.items():
+        line = f'{name:<45} {result["rows"]:>10} {result["seconds"]:>10.4f} {result["peak_mb"]:>10.1f}'
+        if name in baseline:
+            ratio = result['seconds'] / baseline[name]['seconds']
+            line += f' {baseline[name]["seconds"]:>10.4f} {ratio - 1:>+8.0%}'
+            if ratio > REGRESSION_THRESHOLD and result['seconds'] - baseline[name]['seconds'] > REGRESSION_FLOOR:
+                regressions.append(name)
+        print(line)
+
+    if regressions:
+        print(f'\nSlower than the baseline: {", ".join(regressions)}')
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard preprocessing, figures and callbacks.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help='dataset sizes as multiples of the register')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case, the best time is reported')
+    parser.add_argument('--register', default=filepath, help='register, e.g. generated by syntheticRegister.py')
+    parser.add_argument('--cleaned-register', default=cleaned_filepath)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    args = parser.parse_args()
+
+    filepath = args.register
+    cleaned_filepath = args.cleaned_register
+
+    results = run(args.cases, args.scales, args.repeat)
+    regressions = report(results, load_baseline(args.baseline))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f'\nBaseline saved to {args.baseline}')
+    elif regressions:
+        raise SystemExit(1)
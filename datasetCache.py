@@ -0,0 +1,85 @@
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+# Folder for the preprocessed snapshots (next to the datasets, ignored by git)
+CACHE_DIR = 'Datasets/cache'
+
+
+# Hash the content of a file in blocks, so large registers are not read into memory at once
+def file_hash(file_path, block_size=1 << 20):
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+# Write a file through a temporary file next to it, so concurrent threads and workers never read a half written
+# file. `write` gets the temporary path, every write has its own temporary file.
+def atomic_write(path, write):
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=f'{os.path.basename(path)}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Build the cache key from the dataset content and the preprocessing code version
+def snapshot_key(file_path, code_version, content_hash=None):
+    sha = hashlib.sha256()
+    sha.update((content_hash or file_hash(file_path)).encode())
+    sha.update(str(code_version).encode())
+    return sha.hexdigest()[:16]
+
+
+# Path of the snapshot for a given source file and key
+def snapshot_path(file_path, key, cache_dir=CACHE_DIR):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir, f'{name}-{key}.parquet')
+
+
+# Remove snapshots (and the files stored next to them) of the same source file that belong to an older key
+def evict_snapshots(file_path, keep, cache_dir=CACHE_DIR):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    keep_stem = os.path.splitext(os.path.basename(keep))[0]
+    if not os.path.isdir(cache_dir):
+        return
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(name + '-') and not entry.startswith(keep_stem) and not entry.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(cache_dir, entry))
+            except OSError:
+                pass
+
+
+# Load the preprocessed dataset from the snapshot, or build and store it if the snapshot is missing or outdated.
+# A known content hash of the file (see datasetRegistry) saves hashing it again.
+def load_or_build_snapshot(file_path, build, code_version, cache_dir=CACHE_DIR, content_hash=None):
+    key = snapshot_key(file_path, code_version, content_hash)
+    path = snapshot_path(file_path, key, cache_dir)
+
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except (ImportError, OSError, ValueError):
+            # Parquet engine missing or broken file: fall back to a rebuild
+            pass
+
+    df = build(file_path)
+
+    try:
+        atomic_write(path, df.to_parquet)
+        evict_snapshots(file_path, path, cache_dir)
+    except (ImportError, OSError, ValueError):
+        # Without a parquet engine (pyarrow) the dashboard still works, just without the cache
+        pass
+
+    return df
@@ -0,0 +1,115 @@
+import pandas as pd
+
+# Compact dtypes for the datasets kept in memory by the app. Every column gets a kind:
+#   category - few distinct values (entity types, amount and employee bands, fiscal years, dates)
+#   text     - free text, stored as Arrow strings (Python strings without pyarrow)
+#   integer  - downcast to the smallest integer type holding all values
+#   float    - downcast to float32 when no value changes
+# Columns missing from the schema keep their dtype.
+ORIGINAL_SCHEMA = {
+    'Name': 'text',
+    'RegNr': 'text',
+    'Ersteintrag': 'category',
+    'LetzteÄnd': 'category',
+    'Tätigkeit': 'category',
+    'Interessen': 'text',
+    'FinanzAufw': 'category',
+    'Betrag': 'category',
+    'Geschäftsjahr': 'category',
+    'VollzeitEquiv': 'category',
+    'Regelungen': 'float',
+    'Stellungnahmen': 'float',
+    'GrundVerweig': 'category',
+    'Beschäftigte': 'category',
+    'Auftraggeber': 'float',
+    ' index': 'integer',
+}
+
+# The preprocessed dataset has renamed columns and the parsed ranges
+CLEANED_SCHEMA = {
+    **{column: kind for column, kind in ORIGINAL_SCHEMA.items() if column not in ('Tätigkeit', 'Interessen', 'Geschäftsjahr')},
+    'Entity': 'category',
+    'Interests': 'text',
+    'Fiscal Year': 'category',
+    'lower_bound_amount': 'integer',
+    'upper_bound_amount': 'integer',
+    'Ø Amount': 'integer',
+    'lower_bound_emp': 'integer',
+    'upper_bound_emp': 'integer',
+    'Ø Employees': 'integer',
+    'Ø Amount/Employee': 'float',
+}
+
+
+def text_dtype():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'string'
+    return 'string[pyarrow]'
+
+
+def compact_column(series, kind):
+    if kind == 'category':
+        return series.astype('category')
+    if kind == 'text':
+        return series.astype(text_dtype())
+    if kind == 'integer':
+        return pd.to_numeric(series, downcast='integer')
+    if kind == 'float':
+        compact = pd.to_numeric(series, downcast='float')
+        # float32 only when the values survive the round trip (e.g. counts, not averages)
+        if compact.astype(series.dtype).equals(series):
+            return compact
+        return series
+    raise ValueError(f'Unknown column kind: {kind}')
+
+
+# Copy of the frame with the dtypes of the schema
+def compact_frame(df, schema):
+    return df.assign(**{
+        column: compact_column(df[column], kind)
+        for column, kind in schema.items() if column in df.columns
+    })
+
+
+# Arrow schema of a frame with text columns as strings, so frames whose text columns are empty
+# (all NaN) can be written to or read from the same Parquet files as the others
+def arrow_schema(df, preserve_index=False):
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(df, preserve_index=preserve_index)
+    for column, dtype in df.dtypes.items():
+        if pd.api.types.is_object_dtype(dtype) or isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            i = schema.get_field_index(column)
+            schema = schema.set(i, schema.field(i).with_type(pa.string()))
+    return schema
+
+
+# Memory usage per column before and after, with the strings counted
+def memory_report(before, after):
+    report = pd.DataFrame({
+        'dtype before': before.dtypes.astype(str),
+        'dtype after': after.dtypes.astype(str),
+        'MB before': before.memory_usage(deep=True, index=False) / 1e6,
+        'MB after': after.memory_usage(deep=True, index=False) / 1e6,
+    })
+    report.loc['total'] = ['', '', report['MB before'].sum(), report['MB after'].sum()]
+    return report
+
+
+if __name__ == '__main__':
+    from datasetPreprocessingExplore import load_preprocessed_dataset
+
+    filepath = 'Datasets/Lobbyregister2024_full.csv'
+
+    oDf = pd.read_csv(filepath)
+    oDf[' index'] = range(1, len(oDf) + 1)
+    cDf = load_preprocessed_dataset(filepath)
+
+    with pd.option_context('display.width', 200, 'display.float_format', '{:.3f}'.format):
+        print('Original dataset')
+        print(memory_report(oDf, compact_frame(oDf, ORIGINAL_SCHEMA)))
+        print()
+        print('Cleaned dataset')
+        print(memory_report(cDf, compact_frame(cDf, CLEANED_SCHEMA)))
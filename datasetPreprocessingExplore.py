@@ -1,10 +1,34 @@
 import pandas as pd
 from pandas import to_datetime
 
-def preprocess_dataset(file_path):
+from deltaIngest import load_or_update_snapshot
+from parallelPreprocessing import PARTITIONS_PER_WORKER, WORKERS, map_in_processes, split_rows
+from rangeParsing import amount_per_employee, parse_range
 
-    # Load cleaned dataset 
-    cDf = pd.read_csv(file_path)
+# Version of the preprocessing code, increase it whenever the output of preprocess_dataset changes
+PREPROCESSING_VERSION = 3
+
+# Fiscal years look like "01/23 bis 12/23", start and end are parsed for the whole column at once
+FISCAL_YEAR_PATTERN = r'^(?P<start>.*?) bis (?P<end>.*)$'
+
+# Extract the start and end date from a "Geschäftsjahr" column
+def parse_fiscal_years(fiscal_years):
+    dates = fiscal_years.str.extract(FISCAL_YEAR_PATTERN)
+
+    # NaN and non conforming values (no grants or subsidies) get no dates
+    no_grants = fiscal_years.str.contains('Keine Zuwendungen oder Zuschüsse', regex=False, na=False)
+    dates.loc[no_grants] = None
+
+    start = to_datetime('01/' + dates['start'], format='%d/%m/%y', errors='coerce')
+    end = to_datetime('01/' + dates['end'], format='%d/%m/%y', errors='coerce')
+    return pd.DataFrame({'start': start, 'end': end}, index=fiscal_years.index)
+
+def preprocess_dataset(df):
+
+    # Work on plain strings, the dataset registry keeps text columns as categoricals and Arrow strings
+    text_columns = df.select_dtypes(include=['category', 'string']).columns
+    cDf = df.astype(dict.fromkeys(text_columns, object))
+    cDf[text_columns] = cDf[text_columns].where(cDf[text_columns].notna())
 
     # Set original/cleaned dataset index
     cDf[' index'] = range(1, len(cDf) + 1)
@@ -14,51 +38,27 @@ def preprocess_dataset(file_path):
     cDf.loc[cDf['LetzteÄnd']=="–",'LetzteÄnd'] = ''
 
     ## Spendings
-    # Extract the lower and upper bounds of the range
-    cDf['lower_bound_amount'] = cDf['Betrag'].str.extract(r'(\d+)').fillna(0).astype(int)
-    cDf['upper_bound_amount'] = cDf['Betrag'].str.extract(r'bis (\d+(?:\.\d+)?) Euro').fillna(0).astype(int) 
-
-    # Calculate the average spending
-    cDf['Durchschnitt Betrag'] = ((cDf['lower_bound_amount'] + cDf['upper_bound_amount']) / 2).fillna(0).astype(int)
+    # Lower and upper bounds of the range and the average spending
+    lower, upper, average = parse_range(cDf['Betrag'])
+    cDf['lower_bound_amount'] = lower
+    cDf['upper_bound_amount'] = upper
+    cDf['Durchschnitt Betrag'] = average
 
     ## Employees
-    # Extract the lower and upper bounds of the range
-    cDf['lower_bound_emp'] = cDf['Beschäftigte'].str.extract(r'(\d+)').fillna(0).astype(int)
-    cDf['upper_bound_emp'] = cDf['Beschäftigte'].str.extract(r'bis (\d+)').fillna(0).astype(int)
-
-    # Calculate the average number of employees
-    cDf['Durchschnitt Beschäftigte'] = ((cDf['lower_bound_emp'] + cDf['upper_bound_emp']) / 2).fillna(0).astype(int)
-    cDf.loc[cDf['Beschäftigte'] == '0','Durchschnitt Beschäftigte'] = 0
+    # Lower and upper bounds of the range and the average number of employees
+    lower, upper, average = parse_range(cDf['Beschäftigte'])
+    cDf['lower_bound_emp'] = lower
+    cDf['upper_bound_emp'] = upper
+    cDf['Durchschnitt Beschäftigte'] = average
 
     # Average spending per employee
-    cDf['Betrag / Beschäftigte'] = cDf['Durchschnitt Betrag'] / cDf['Durchschnitt Beschäftigte']
+    cDf['Betrag / Beschäftigte'] = amount_per_employee(cDf['Durchschnitt Betrag'], cDf['Durchschnitt Beschäftigte'])
 
     # Extract the start and end date from the "Geschäftsjahr" column
-    def extract_dates(row):
-        if pd.isna(row) or 'Keine Zuwendungen oder Zuschüsse' in row:  # Überprüfung auf NaN und nicht konforme Werte
-            return pd.Series([pd.NaT, pd.NaT])  # Rückgabe von NaT für fehlende oder nicht konforme Daten
-        start_date, end_date = row.split(' bis ')
-        start_date = pd.to_datetime('01/' + start_date, format='%d/%m/%y', errors='coerce').date()
-        end_date = pd.to_datetime('01/' + end_date, format='%d/%m/%y', errors='coerce').date()
-        return pd.Series([start_date, end_date])
-
-    # Anwenden der Funktion auf die Spalte "Geschäftsjahr"
-    cDf[['GeschäftsjahrStart', 'GeschäftsjahrEnde']] = cDf['Geschäftsjahr'].apply(extract_dates)
-
-    # Changing Columns to numeric values and converting to int
-    cDf['lower_bound_amount'] = pd.to_numeric(cDf['lower_bound_amount'], errors='coerce').fillna(0).astype(int)
-    cDf['upper_bound_amount'] = pd.to_numeric(cDf['upper_bound_amount'], errors='coerce').fillna(0).astype(int)
-    cDf['lower_bound_emp'] = pd.to_numeric(cDf['lower_bound_emp'], errors='coerce').fillna(0).astype(int)
-    cDf['upper_bound_emp'] = pd.to_numeric(cDf['upper_bound_emp'], errors='coerce').fillna(0).astype(int)
-    cDf['Durchschnitt Betrag'] = pd.to_numeric(cDf['Durchschnitt Betrag'], errors='coerce').fillna(0).astype(int)
-    cDf['Durchschnitt Beschäftigte'] = pd.to_numeric(cDf['Durchschnitt Beschäftigte'], errors='coerce').fillna(0).astype(int)
-
-    # Convert to datetime
-    cDf['GeschäftsjahrStart'] = to_datetime(cDf['GeschäftsjahrStart'])
-    cDf['GeschäftsjahrEnde'] = to_datetime(cDf['GeschäftsjahrEnde'])
+    cDf[['GeschäftsjahrStart', 'GeschäftsjahrEnde']] = parse_fiscal_years(cDf['Geschäftsjahr'])
 
     # Filter out rows with unnecessary data
-    cDf= cDf[((cDf['Durchschnitt Betrag'] > 5000) & (cDf['Durchschnitt Beschäftigte'] > 5)) | (cDf['Durchschnitt Beschäftigte'] > 1) & (cDf['Durchschnitt Betrag']/cDf['Durchschnitt Beschäftigte'] > 20000)].sort_values('Name')
+    cDf= cDf[((cDf['Durchschnitt Betrag'] > 5000) & (cDf['Durchschnitt Beschäftigte'] > 5)) | (cDf['Durchschnitt Beschäftigte'] > 1) & (cDf['Durchschnitt Betrag']/cDf['Durchschnitt Beschäftigte'] > 20000)].sort_values('Name', kind='stable')
 
     # Rename columns
     cDf.rename(columns={'Durchschnitt Betrag': 'Ø Amount', 
@@ -70,4 +70,36 @@ def preprocess_dataset(file_path):
                         'Tätigkeit': 'Entity',
                         'Interessen': 'Interests'}, 
                         inplace=True)
-    return cDf
\ No newline at end of file
+    return cDf
+
+# preprocess_dataset of row partitions in worker processes. Rows are preprocessed independently of each other,
+# the partitions are merged in order and sorted like preprocess_dataset, so the result is the same.
+def preprocess_dataset_parallel(df, workers=WORKERS):
+    if workers <= 1 or len(df) < 2:
+        return preprocess_dataset(df)
+    partitions = split_rows(df, workers * PARTITIONS_PER_WORKER)
+    results = map_in_processes(preprocess_dataset, partitions, workers)
+
+    # Positions in the whole frame instead of the partition
+    offset = 0
+    for partition, result in zip(partitions, results):
+        result[' index'] += offset
+        offset += len(partition)
+    return pd.concat(results).sort_values('Name', kind='stable')
+
+# Rows merged by an incremental update get their position in the register and the order of preprocess_dataset
+def finalize_dataset(df, positions):
+    df.index = positions
+    df[' index'] = positions + 1
+    return df.sort_values('Name', kind='stable')
+
+# Load the preprocessed dataset from the on-disk snapshot. When the CSV changed, only new and changed entries
+# are preprocessed and merged into the previous snapshot, a change of the preprocessing rebuilds it completely.
+# load_raw returns the raw dataset of the file (the dataset registry passes its already loaded frame).
+# Snapshots streamed by streamingIngest.py are only sorted chunk by chunk, the stable sort restores the order.
+# With several workers the rows to preprocess are split across processes.
+def load_preprocessed_dataset(file_path, load_raw=pd.read_csv, content_hash=None, workers=WORKERS):
+    process = lambda raw: preprocess_dataset_parallel(raw, workers)
+    df = load_or_update_snapshot(file_path, load_raw, process, PREPROCESSING_VERSION, finalize=finalize_dataset,
+                                 ignore_columns=(' index',), content_hash=content_hash)
+    return df.sort_values('Name', kind='stable')
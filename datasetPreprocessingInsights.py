@@ -1,13 +1,16 @@
-from fuzzywuzzy import process
-import Levenshtein as lev
+from functools import lru_cache
+
+import os
 import pandas as pd
-import plotly.express as px
 import re
+import threading
 
+from datasetRegistry import datasets
+from deltaIngest import load_or_update_snapshot
+from interestIndex import homogenize_interests
+from parallelPreprocessing import WORKERS
 
-# Read cleaned dataset
-filepath = 'Datasets/cleanedLobbyregister2024.csv'
-cleanedDataset = pd.read_csv(filepath)
+# plotly.express is imported in the figure functions, it takes longer to import than the rest of the app
 
 # Select text for selected insights section
 def selectInsightsText(chapter):
@@ -23,153 +26,175 @@ def selectInsightsText(chapter):
     else:
         return "No insights available for this chapter."
 
+# Define the mapping of interests to supercategories based on the German Lobby registry website
+interest_to_supercategory = {
+    'Arbeit und Beschäftigung': ['Arbeit und Beschäftigung', 'Arbeitsmarkt', 'Arbeitsrecht/Arbeitsbedingungen', 'Sonstiges im Bereich "Arbeit und Beschäftigung"'],
+    'Außenpolitik und internationale Beziehungen': ['Außenpolitik und internationale Beziehungen', 'Außenpolitik', 'Auswärtige Kultur- und Bildungspolitik', 'Internationale Beziehungen', 'Menschenrechte', 'Sonstiges im Bereich "Außenpolitik und internationale Beziehungen"'],
+    'Außenwirtschaft': ['Außenwirtschaft'],
+    'Bildung und Erziehung': ['Bildung und Erziehung', 'Berufliche Bildung', 'Hochschulbildung', 'Schulische Bildung','Vorschulische Bildung', 'Sonstiges im Bereich "Bildung und Erziehung"'],
+    'Bundestag': ['Bundestag', 'Parlamentarisches Verfahren', 'Rechtsstellung der Abgeordneten', 'Wahlrecht', 'Sonstiges im Bereich "Bundestag"'],
+    'Deutsche Einheit': ['Deutsche Einheit', 'Aufarbeitung SED-Unrecht','Gewährleistung gleichwertiger Lebensverhältnisse','Sonstiges im Bereich "Deutsche Einheit"'],
+    'Energie': ['Energie', 'Allgemeine Energiepolitik', 'Atomenergie','Energienetze', 'Erneuerbare Energien', 'Fossile Energien','Sonstiges im Bereich "Energie"'],
+    'Entwicklungspolitik': ['Entwicklungspolitik'],
+    'Europapolitik und Europäische Union': ['Europapolitik und Europäische Union', 'EU-Binnenmarkt','EU-Gesetzgebung','Gemeinsame Außen- und Sicherheitspolitik der EU','Institutionelle Fragen der EU','Polizeiliche und justizielle Zusammenarbeit in der EU','Sonstiges im Bereich "Europapolitik und Europäische Union"'],
+    'Gesellschaftspolitik und soziale Gruppen': ['Gesellschaftspolitik und soziale Gruppen', 'Diversitätspolitik','Familienpolitik','Geschlechterpolitik','Kinder- und Jugendpolitik','Rechte von Menschen mit Behinderung','Religion/Weltanschauung','Seniorenpolitik','Sonstiges im Bereich "Gesellschaftspolitik und soziale Gruppen"'],
+    'Gesundheit': ['Gesundheit', 'Arzneimittel','Gesundheitsförderung','Gesundheitsversorgung','Pflege', 'Sonstiges im Bereich "Gesundheit"'],
+    'Innere Sicherheit': ['Innere Sicherheit', 'Bevölkerungsschutz und Katastrophenhilfe','Cybersicherheit','Extremismusbekämpfung','Kriminalitätsbekämpfung','Opferschutz','Terrorismusbekämpfung','Sonstiges im Bereich "Innere Sicherheit"'],
+    'Kultur': ['Kultur'],
+    'Landwirtschaft und Ernährung': ['Landwirtschaft und Ernährung', 'Fischerei/Aquakultur','Land- und Forstwirtschaft','Lebensmittelsicherheit','Lebens- und Genussmittelindustrie','Sonstiges im Bereich "Landwirtschaft und Ernährung"'],
+    'Medien, Kommunikation und Informationstechnik': ['Medien, Kommunikation und Informationstechnik', 'Datenschutz und Informationssicherheit','Digitalisierung','Internetpolitik','Kommunikations- und Informationstechnik','Massenmedien','Meinungs- und Pressefreiheit','Urheberrecht','Werbung','Sonstiges im Bereich "Medien, Kommunikation und Informationstechnik"'],
+    'Migration, Flüchtlingspolitik und Integration': ['Migration, Flüchtlingspolitik und Integration', 'Asyl und Flüchtlingsschutz', 'Ausländer- und Aufenthaltsrecht', 'Integration','Migration','Sonstiges im Bereich "Migration, Flüchtlingspolitik und Integration"'],
+    'Öffentliche Finanzen, Steuern und Abgaben': ['Öffentliche Finanzen, Steuern und Abgaben'],
+    'Politisches Leben, Parteien': ['Politisches Leben, Parteien'],
+    'Raumordnung, Bau- und Wohnungswesen': ['Raumordnung, Bau- und Wohnungswesen', 'Bauwesen und Bauwirtschaft','Ländlicher Raum','Stadtentwicklung','Wohnen','Sonstiges im Bereich "Raumordnung, Bau- und Wohnungswesen"'],
+    'Recht': ['Recht', 'Öffentliches Recht','Rechtspolitik','Strafrecht','Zivilrecht','Sonstiges im Bereich "Recht"'],
+    'Soziale Sicherung': ['Soziale Sicherung', 'Arbeitslosenversicherung','Grundsicherung','Krankenversicherung','Pflegeversicherung','Rente/Alterssicherung','Unfallversicherung','Sonstiges im Bereich "Soziale Sicherung"'],
+    'Sport, Freizeit und Tourismus': ['Sport, Freizeit und Tourismus', 'Breitensport','Profisport','Tourismus','Sonstiges im Bereich "Sport, Freizeit und Tourismus"'],
+    'Staat und Verwaltung': ['Staat und Verwaltung', 'Öffentlicher Dienst und öffentliche Verwaltung','Staatsorganisation','Verwaltungstransparenz/Open Government','Sonstiges im Bereich "Staat und Verwaltung"'],
+    'Umwelt': ['Umwelt', 'Artenschutz/Biodiversität', 'Immissionsschutz', 'Klimaschutz', 'Nachhaltigkeit und Ressourcenschutz', 'Tierschutz', 'Sonstiges im Bereich "Umwelt"'],
+    'Verkehr': ['Verkehr', 'Güterverkehr','Luft- und Raumfahrt','Personenverkehr','Schienenverkehr','Schifffahrt','Straßenverkehr','Verkehrsinfrastruktur','Verkehrspolitik','Sonstiges im Bereich "Verkehr"'],
+    'Verteidigung': ['Verteidigung', 'Bundeswehrangelegenheiten','Rüstungsangelegenheiten','Verteidigungspolitik','Sonstiges im Bereich "Verteidigung"'],
+    'Wirtschaft': ['Wirtschaft', 'Automobilwirtschaft', 'Bank- und Finanzwesen', 'E-Commerce', 'Handel und Dienstleistungen', 'Handwerk', 'Industriepolitik','Kleine und mittlere Unternehmen','Verbraucherschutz','Versicherungswesen','Wettbewerbsrecht','Sonstiges im Bereich "Wirtschaft"'],
+    'Wissenschaft, Forschung und Technologie': ['Wissenschaft, Forschung und Technologie'],
+    'Sonstige Interessenbereiche':['Sonstige Interessenbereiche']
+}
+
+# Create a reverse mapping from interest to supercategory
+interest_to_supercategory_reverse = {interest: supercategory for supercategory, interests in interest_to_supercategory.items() for interest in interests}
+
 # Truncate labels 
 def truncate_label(label, max_length=15):
         return label if len(label) <= max_length else label[:max_length] + '...'
 
-# Df
-def dfTIG():
-    df_exploded = cleanedDataset.copy()
-    df_exploded['Interessen'] = df_exploded['Interessen'].astype(str)
-    df_exploded['Interessen'] = df_exploded['Interessen'].str.split('; ')
-    df_exploded = df_exploded.explode('Interessen')
-
-    # A function to homogenize the interests
-    unique_interests = df_exploded['Interessen'].unique()
-
-    def homogenize_interests(interests, max_distance=2):
-        interest_map = {}
-        for interest in interests:
-            # Find the closest match with the existing interests already in the map
-            closest_matches = process.extract(interest, interest_map.keys(), limit=1)
-            if closest_matches and lev.distance(interest, closest_matches[0][0]) < max_distance:
-                # If a match is found within the distance threshold, map to the existing interest
-                interest_map[interest] = interest_map[closest_matches[0][0]]
-            else:
-                # Otherwise add it as a new unique interest
-                interest_map[interest] = interest
-        return interest_map
-
-    interest_map = homogenize_interests(unique_interests)
-    df_exploded['Interessen'] = df_exploded['Interessen'].map(interest_map)
+# Version of explode_interests, increase it whenever its output changes
+INTERESTS_VERSION = 2
 
-    # Flatten the list of interests in each row, considering empty interest rows
-    flattened_interests = df_exploded['Interessen']
+# Interest columns of the long table, stored as categorical codes (the table has about 20 rows per entity)
+INTEREST_COLUMNS = ['Interessen', 'Homogenized', 'Supercategory']
 
-    # Remove leading and trailing punctuation
-    #flattened_interests = flattened_interests.str.replace('^\W+|\W+$', '', regex=True)
-
-    # Strip leading and trailing whitespace
-    flattened_interests = flattened_interests.str.strip()
-
-    # Drop any empty interests
-    flattened_interests = flattened_interests[flattened_interests != '']
+# One row per entity and interest, with the homogenized interest and its supercategory.
+# New interests are matched in `workers` processes when there are many of them, `scope` names the
+# register whose stored interest map is used (None for frames that are not a register file).
+def explode_interests(cleaned, workers=WORKERS, scope=None):
+    df_exploded = cleaned[['RegNr', 'Name', 'Tätigkeit', 'Interessen']].copy()
+    df_exploded['Interessen'] = df_exploded['Interessen'].str.split('; ')
+    df_exploded = df_exploded.explode('Interessen', ignore_index=True)
 
+    # Homogenize the interests (similar spellings are mapped to the same interest)
+    unique_interests = df_exploded['Interessen'].unique()
+    interest_map = homogenize_interests(unique_interests, workers, scope, canonical=interest_to_supercategory_reverse)
+    homogenized = df_exploded['Interessen'].map(interest_map)
+
+    # Map the homogenized interests to their supercategories, interests without one go to "Sonstige Interessenbereiche"
+    supercategory = homogenized.map(interest_to_supercategory_reverse).fillna('Sonstige Interessenbereiche')
+
+    df_exploded['Homogenized'] = homogenized
+    df_exploded['Supercategory'] = supercategory
+    return df_exploded.astype(dict.fromkeys(INTEREST_COLUMNS, 'category'))
+
+# Long table of a cleaned register file, stored as a snapshot and homogenized with the interest map
+# of that register. A new version of the register only explodes its new and changed entries.
+def load_interests(file_path, load_raw=pd.read_csv, content_hash=None, workers=WORKERS):
+    scope = os.path.splitext(os.path.basename(file_path))[0]
+    return load_or_update_snapshot(file_path, load_raw, lambda cleaned: explode_interests(cleaned, workers, scope),
+                                   INTERESTS_VERSION,
+                                   finalize=lambda df, positions: df.astype(dict.fromkeys(INTEREST_COLUMNS, 'category')),
+                                   content_hash=content_hash)
+
+# One lock per cached frame and dataset version, concurrent callers (e.g. the figure warm-up and a request)
+# wait for the same build instead of building the frame and writing its snapshot at the same time
+_build_locks = {}
+_build_locks_lock = threading.Lock()
+
+def _built_once(cached, registry, version, *args):
+    with _build_locks_lock:
+        lock = _build_locks.setdefault((cached.__name__, version, *args), threading.Lock())
+    with lock:
+        return cached(registry, version, *args)
+
+# Long table with one row per entity and interest, shared by the interest plots and the network.
+# A dataset replaced in the registry (e.g. scaled by the benchmarks) is exploded without the snapshot.
+# The frames below are computed from the given registry and cached per registry and dataset version,
+# so the figures of a reloaded version never mix with those of the version before.
+def dfInterests(registry=datasets):
+    return _built_once(_dfInterests, registry, registry.version('cleaned'))
+
+@lru_cache(maxsize=2)
+def _dfInterests(registry, version):
+    if not registry.from_source('cleaned'):
+        return explode_interests(registry.get('cleaned'))
+    return load_interests(registry.source('cleaned'), lambda file_path: registry.get('cleaned'),
+                          content_hash=registry.content_hash('cleaned'))
 
-    # Define the mapping of interests to supercategories based on the German Lobby registry website
-    interest_to_supercategory = {
-        'Arbeit und Beschäftigung': ['Arbeit und Beschäftigung', 'Arbeitsmarkt', 'Arbeitsrecht/Arbeitsbedingungen', 'Sonstiges im Bereich "Arbeit und Beschäftigung"'],
-        'Außenpolitik und internationale Beziehungen': ['Außenpolitik und internationale Beziehungen', 'Außenpolitik', 'Auswärtige Kultur- und Bildungspolitik', 'Internationale Beziehungen', 'Menschenrechte', 'Sonstiges im Bereich "Außenpolitik und internationale Beziehungen"'],
-        'Außenwirtschaft': ['Außenwirtschaft'],
-        'Bildung und Erziehung': ['Bildung und Erziehung', 'Berufliche Bildung', 'Hochschulbildung', 'Schulische Bildung','Vorschulische Bildung', 'Sonstiges im Bereich "Bildung und Erziehung"'],
-        'Bundestag': ['Bundestag', 'Parlamentarisches Verfahren', 'Rechtsstellung der Abgeordneten', 'Wahlrecht', 'Sonstiges im Bereich "Bundestag"'],
-        'Deutsche Einheit': ['Deutsche Einheit', 'Aufarbeitung SED-Unrecht','Gewährleistung gleichwertiger Lebensverhältnisse','Sonstiges im Bereich "Deutsche Einheit"'],
-        'Energie': ['Energie', 'Allgemeine Energiepolitik', 'Atomenergie','Energienetze', 'Erneuerbare Energien', 'Fossile Energien','Sonstiges im Bereich "Energie"'],
-        'Entwicklungspolitik': ['Entwicklungspolitik'],
-        'Europapolitik und Europäische Union': ['Europapolitik und Europäische Union', 'EU-Binnenmarkt','EU-Gesetzgebung','Gemeinsame Außen- und Sicherheitspolitik der EU','Institutionelle Fragen der EU','Polizeiliche und justizielle Zusammenarbeit in der EU','Sonstiges im Bereich "Europapolitik und Europäische Union"'],
-        'Gesellschaftspolitik und soziale Gruppen': ['Gesellschaftspolitik und soziale Gruppen', 'Diversitätspolitik','Familienpolitik','Geschlechterpolitik','Kinder- und Jugendpolitik','Rechte von Menschen mit Behinderung','Religion/Weltanschauung','Seniorenpolitik','Sonstiges im Bereich "Gesellschaftspolitik und soziale Gruppen"'],
-        'Gesundheit': ['Gesundheit', 'Arzneimittel','Gesundheitsförderung','Gesundheitsversorgung','Pflege', 'Sonstiges im Bereich "Gesundheit"'],
-        'Innere Sicherheit': ['Innere Sicherheit', 'Bevölkerungsschutz und Katastrophenhilfe','Cybersicherheit','Extremismusbekämpfung','Kriminalitätsbekämpfung','Opferschutz','Terrorismusbekämpfung','Sonstiges im Bereich "Innere Sicherheit"'],
-        'Kultur': ['Kultur'],
-        'Landwirtschaft und Ernährung': ['Landwirtschaft und Ernährung', 'Fischerei/Aquakultur','Land- und Forstwirtschaft','Lebensmittelsicherheit','Lebens- und Genussmittelindustrie','Sonstiges im Bereich "Landwirtschaft und Ernährung"'],
-        'Medien, Kommunikation und Informationstechnik': ['Medien, Kommunikation und Informationstechnik', 'Datenschutz und Informationssicherheit','Digitalisierung','Internetpolitik','Kommunikations- und Informationstechnik','Massenmedien','Meinungs- und Pressefreiheit','Urheberrecht','Werbung','Sonstiges im Bereich "Medien, Kommunikation und Informationstechnik"'],
-        'Migration, Flüchtlingspolitik und Integration': ['Migration, Flüchtlingspolitik und Integration', 'Asyl und Flüchtlingsschutz', 'Ausländer- und Aufenthaltsrecht', 'Integration','Migration','Sonstiges im Bereich "Migration, Flüchtlingspolitik und Integration"'],
-        'Öffentliche Finanzen, Steuern und Abgaben': ['Öffentliche Finanzen, Steuern und Abgaben'],
-        'Politisches Leben, Parteien': ['Politisches Leben, Parteien'],
-        'Raumordnung, Bau- und Wohnungswesen': ['Raumordnung, Bau- und Wohnungswesen', 'Bauwesen und Bauwirtschaft','Ländlicher Raum','Stadtentwicklung','Wohnen','Sonstiges im Bereich "Raumordnung, Bau- und Wohnungswesen"'],
-        'Recht': ['Recht', 'Öffentliches Recht','Rechtspolitik','Strafrecht','Zivilrecht','Sonstiges im Bereich "Recht"'],
-        'Soziale Sicherung': ['Soziale Sicherung', 'Arbeitslosenversicherung','Grundsicherung','Krankenversicherung','Pflegeversicherung','Rente/Alterssicherung','Unfallversicherung','Sonstiges im Bereich "Soziale Sicherung"'],
-        'Sport, Freizeit und Tourismus': ['Sport, Freizeit und Tourismus', 'Breitensport','Profisport','Tourismus','Sonstiges im Bereich "Sport, Freizeit und Tourismus"'],
-        'Staat und Verwaltung': ['Staat und Verwaltung', 'Öffentlicher Dienst und öffentliche Verwaltung','Staatsorganisation','Verwaltungstransparenz/Open Government','Sonstiges im Bereich "Staat und Verwaltung"'],
-        'Umwelt': ['Umwelt', 'Artenschutz/Biodiversität', 'Immissionsschutz', 'Klimaschutz', 'Nachhaltigkeit und Ressourcenschutz', 'Tierschutz', 'Sonstiges im Bereich "Umwelt"'],
-        'Verkehr': ['Verkehr', 'Güterverkehr','Luft- und Raumfahrt','Personenverkehr','Schienenverkehr','Schifffahrt','Straßenverkehr','Verkehrsinfrastruktur','Verkehrspolitik','Sonstiges im Bereich "Verkehr"'],
-        'Verteidigung': ['Verteidigung', 'Bundeswehrangelegenheiten','Rüstungsangelegenheiten','Verteidigungspolitik','Sonstiges im Bereich "Verteidigung"'],
-        'Wirtschaft': ['Wirtschaft', 'Automobilwirtschaft', 'Bank- und Finanzwesen', 'E-Commerce', 'Handel und Dienstleistungen', 'Handwerk', 'Industriepolitik','Kleine und mittlere Unternehmen','Verbraucherschutz','Versicherungswesen','Wettbewerbsrecht','Sonstiges im Bereich "Wirtschaft"'],
-        'Wissenschaft, Forschung und Technologie': ['Wissenschaft, Forschung und Technologie'],
-        'Sonstige Interessenbereiche':['Sonstige Interessenbereiche']
-    }
-
-    # Create a reverse mapping from interest to supercategory
-    interest_to_supercategory_reverse = {interest: supercategory for supercategory, interests in interest_to_supercategory.items() for interest in interests}
-
-    # Map the interests in df_exploded to their supercategories
-    df_exploded_small = df_exploded.copy()
-    df_exploded_small['Supercategory'] = df_exploded_small['Interessen'].map(interest_to_supercategory_reverse)
-
-    # Drop rows where the supercategory is not defined
-    #df_exploded_small = df_exploded_small.dropna(subset=['Supercategory'])
-    df_exploded_small = df_exploded_small.fillna('Sonstige Interessenbereiche')
+# Df
+def dfTIG(registry=datasets):
+    df_exploded = dfInterests(registry)
 
     # Group by 'Tätigkeit' and 'Interessen' and count the occurrences
-    taetigkeit_interessen_counts = df_exploded_small.groupby(['Name','Tätigkeit', 'Supercategory']).size().reset_index(name='Count').groupby(['Tätigkeit', 'Supercategory']).size().reset_index(name='Count')
+    taetigkeit_interessen_counts = df_exploded.groupby(['Name','Tätigkeit', 'Supercategory'], observed=True).size().reset_index(name='Count').groupby(['Tätigkeit', 'Supercategory'], observed=True).size().reset_index(name='Count')
+    taetigkeit_interessen_counts['Supercategory'] = taetigkeit_interessen_counts['Supercategory'].astype(str)
 
     taetigkeit_interessen_counts['short_entity'] = [truncate_label(label) for label in taetigkeit_interessen_counts['Tätigkeit']]
 
     return taetigkeit_interessen_counts
 
 
-def dfEntities(type):
-# Count the number of individual interest areas
-    
-    def count_interests(row):
-        if type == 1:
-            return len(row['Interessen'])  # Splitting on semicolon to count interests
-        else:
-            if isinstance(row['Interessen'], str):
-                return len(row['Interessen'].split(';'))  # Assuming interests are separated by semicolons
-            else:
-                return 0  # Return 0 if 'Interessen' is NaN or not a string
-
-    cleanedDataset['Nummer Interessen'] = cleanedDataset.apply(count_interests, axis=1)
-
-    df_entities = cleanedDataset.value_counts('Tätigkeit').to_frame()
-    df_entities['Total Spending'] = cleanedDataset.groupby('Tätigkeit')['Betrag'].sum()
-    df_entities['Total Employees'] = cleanedDataset.groupby('Tätigkeit')['Beschäftigte'].sum()
-    df_entities['Spending per Employee'] = df_entities['Total Spending']/df_entities['Total Employees']
-    df_entities['Median Interests'] = cleanedDataset.groupby('Tätigkeit')['Nummer Interessen'].median()
-    df_entities['Mean Interests'] = cleanedDataset.groupby('Tätigkeit')['Nummer Interessen'].mean()
-    df_entities['Median Employees'] = cleanedDataset.groupby('Tätigkeit')['Beschäftigte'].median()
-    df_entities['Mean Employees'] = cleanedDataset.groupby('Tätigkeit')['Beschäftigte'].mean()
-
-
-    def truncate_label(label, max_length=15):
-        return label if len(label) <= max_length else label[:max_length] + '...'
-
-
-    # Funktion zum Kürzen der Labels
-    def truncate_label(label, max_length=15):
-        return label if len(label) <= max_length else label[:max_length] + '...'
+# Metrics per entity type, computed once per type and shared by all entity plots
+@lru_cache(maxsize=8)
+def _dfEntities(registry, version, type):
+    cleanedDataset = registry.get('cleaned')
 
-    # Labels kürzen
-    df_entities = df_entities.reset_index().rename(columns={"index": "Entity type", "count": "Number of entities"})
-    df_entities = df_entities.rename(columns={"Tätigkeit": "Entity type"})
+    # Count the number of individual interest areas
+    if type == 1:
+        number_interests = cleanedDataset['Interessen'].str.len()
+    else:
+        # Interests are separated by semicolons, entities without interests have 0
+        number_interests = cleanedDataset['Interessen'].str.count(';').add(1).fillna(0)
+
+    metrics = pd.DataFrame({'Betrag': cleanedDataset['Betrag'],
+                            'Beschäftigte': cleanedDataset['Beschäftigte'],
+                            'Nummer Interessen': number_interests})
+
+    # All metrics in a single pass over the groups
+    df_entities = metrics.groupby(cleanedDataset['Tätigkeit']).agg(**{
+        'count': ('Betrag', 'size'),
+        'Total Spending': ('Betrag', 'sum'),
+        'Total Employees': ('Beschäftigte', 'sum'),
+        'Median Interests': ('Nummer Interessen', 'median'),
+        'Mean Interests': ('Nummer Interessen', 'mean'),
+        'Median Employees': ('Beschäftigte', 'median'),
+        'Mean Employees': ('Beschäftigte', 'mean'),
+    })
+    df_entities.insert(3, 'Spending per Employee', df_entities['Total Spending']/df_entities['Total Employees'])
+
+    # Biggest entity types first
+    df_entities = df_entities.sort_values('count', ascending=False)
 
     # Labels kürzen
+    df_entities = df_entities.reset_index().rename(columns={"Tätigkeit": "Entity type", "count": "Number of entities"})
     df_entities['short_entity'] = [truncate_label(label) for label in df_entities['Entity type']]
 
     return df_entities
 
+# Entity metrics, the cached frame is copied so callers can not change it for others
+def dfEntities(type, registry=datasets):
+    return _built_once(_dfEntities, registry, registry.version('cleaned'), type).copy()
+
+# Forget the derived frames, e.g. when the cleaned dataset was reloaded
+def clear_caches():
+    _dfInterests.cache_clear()
+    _dfEntities.cache_clear()
+
 # -------------------------------------- Chapter 1 --------------------------------------
 
 
 # Plot 1
 
-def createFigUniqueInterests():
-    # Split the values in "Interessen- und Vorhabenbereiche" column and create new rows
-    df_exploded = cleanedDataset.copy()
+def createFigUniqueInterests(registry=datasets):
+    import plotly.express as px
 
-    df_exploded['Interessen'] = cleanedDataset['Interessen'].str.split('; ')
-    df_exploded = df_exploded.explode('Interessen')
+    # One row per entity and interest
+    df_exploded = dfInterests(registry)
 
     # Group by "Tätigkeit" and count the number of unique "Interessen" for each
     taetigkeit_interessen_counts = df_exploded.groupby('Tätigkeit')['Interessen'].nunique().reset_index()
@@ -200,15 +225,15 @@ def createFigUniqueInterests():
 
 #Plot 2
 
-def createFigAverageInterests():
+def createFigAverageInterests(registry=datasets):
+    import plotly.express as px
 
-    df_entities = dfEntities(0)
+    df_entities = dfEntities(0, registry)
 
     fig = px.bar(
         df_entities, 
         x='Entity type', 
-        y=[df_entities['Mean Interests'], 
-        df_entities['Median Interests']], 
+        y=['Mean Interests', 'Median Interests'],
         barmode="group",
         title="Average number of Interests",
         hover_name='Entity type',
@@ -233,33 +258,14 @@ def createFigAverageInterests():
 
 #   Plot 3
 
-def createFigBiggestInterestAreas():
+def createFigBiggestInterestAreas(registry=datasets):
+    import plotly.express as px
 
-    df_exploded = cleanedDataset.copy()
-
-    df_exploded['Interessen'] = cleanedDataset['Interessen'].str.split('; ')
-    df_exploded = df_exploded.explode('Interessen')
-
-    # A function to homogenize the interests
-    unique_interests = df_exploded['Interessen'].unique()
-    def homogenize_interests(interests, max_distance=2):
-        interest_map = {}
-        for interest in interests:
-            # Find the closest match with the existing interests already in the map
-            closest_matches = process.extract(interest, interest_map.keys(), limit=1)
-            if closest_matches and lev.distance(interest, closest_matches[0][0]) < max_distance:
-                # If a match is found within the distance threshold, map to the existing interest
-                interest_map[interest] = interest_map[closest_matches[0][0]]
-            else:
-                # Otherwise add it as a new unique interest
-                interest_map[interest] = interest
-        return interest_map
-
-    interest_map = homogenize_interests(unique_interests)
-    df_exploded['Interessen'] = df_exploded['Interessen'].map(interest_map)
+    # One row per entity and interest, with the homogenized interests
+    df_exploded = dfInterests(registry)
 
     # Flatten the list of interests in each row, considering empty interest rows
-    flattened_interests = df_exploded['Interessen']
+    flattened_interests = df_exploded['Homogenized'].astype(object)
     # Remove leading and trailing punctuation
     flattened_interests = flattened_interests.str.replace('^\W+|\W+$', '', regex=True)
 
@@ -306,9 +312,10 @@ def createFigBiggestInterestAreas():
 
 # -------------------------------------- Chapter 2 --------------------------------------
 
-def createFigEmployeesPie():
+def createFigEmployeesPie(registry=datasets):
+    import plotly.express as px
 
-    df_entities = dfEntities(0)
+    df_entities = dfEntities(0, registry)
 
     figPieEmployees = px.pie(df_entities, 
                     values='Total Employees', 
@@ -332,9 +339,10 @@ def createFigEmployeesPie():
 
 # Plot 1
 
-def createFigSpendingsPie():
+def createFigSpendingsPie(registry=datasets):
+    import plotly.express as px
 
-    df_entities = dfEntities(0)
+    df_entities = dfEntities(0, registry)
 
     figPie = px.pie(df_entities, 
                     values='Total Spending', 
@@ -358,9 +366,10 @@ def createFigSpendingsPie():
 
 # Plot 2
 
-def createFigSpendingsScatter():
+def createFigSpendingsScatter(registry=datasets):
+    import plotly.express as px
 
-    figScatter = px.scatter(cleanedDataset, 
+    figScatter = px.scatter(registry.get('cleaned'), 
                             x="Beschäftigte", 
                             y="Betrag", 
                             labels={'Name': "Name", 'Betrag': "Spending", 'Beschäftigte': "Employees"}, 
@@ -385,9 +394,10 @@ def createFigSpendingsScatter():
 
 # Plot 3
 
-def createFigSpendingsPerEmployee():
+def createFigSpendingsPerEmployee(registry=datasets):
+    import plotly.express as px
 
-    df_entities = dfEntities(0)
+    df_entities = dfEntities(0, registry)
 
     figSpendingPerEmployee = px.bar(df_entities, 
                                     x='Entity type', 
@@ -419,9 +429,10 @@ def createFigSpendingsPerEmployee():
 
 # Plot 1
 
-def createFigNumberOfEntities():#
+def createFigNumberOfEntities(registry=datasets):#
+    import plotly.express as px
 
-    df_entities = dfEntities(0)
+    df_entities = dfEntities(0, registry)
 
     fig = px.bar(df_entities, x='Entity type', y='Number of entities', hover_name='Entity type')
 
@@ -447,14 +458,14 @@ def createFigNumberOfEntities():#
 
 # Plot 2
 
-def createFigAverageEmployees():
+def createFigAverageEmployees(registry=datasets):
+    import plotly.express as px
 
-    df_entities = dfEntities(0)
+    df_entities = dfEntities(0, registry)
 
     fig = px.bar(df_entities, 
                  x='Entity type', 
-                 y=[df_entities['Mean Employees'], 
-                    df_entities['Median Employees']],
+                 y=['Mean Employees', 'Median Employees'],
                  barmode="group",
                  title='Average Employees per Entity',
                  hover_name='Entity type',
@@ -483,9 +494,10 @@ def createFigAverageEmployees():
 
 #Plot 3
 
-def createFigInterestPerEntity():
+def createFigInterestPerEntity(registry=datasets):
+    import plotly.express as px
 
-    taetigkeit_interessen_counts = dfTIG()
+    taetigkeit_interessen_counts = dfTIG(registry)
 
     # Create a bubble chart using Plotly
     fig = px.scatter(taetigkeit_interessen_counts, 
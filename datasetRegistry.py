@@ -0,0 +1,121 @@
+import threading
+
+import pandas as pd
+
+from datasetCache import file_hash
+from datasetDtypes import CLEANED_SCHEMA, ORIGINAL_SCHEMA, compact_frame
+
+# Sources of the dashboard
+ORIGINAL_DATASET = 'Datasets/Lobbyregister2024_full.csv'
+CLEANED_DATASET = 'Datasets/cleanedLobbyregister2024.csv'
+
+
+# The frames handed out share their memory with the registry. With copy-on-write a change of a frame
+# (also .loc/.iloc assignments and in place operators) copies the changed column first, so a caller
+# can not change the dataset for the others.
+pd.options.mode.copy_on_write = True
+
+
+# Every dataset is loaded once on first access. The version is the content hash of its source file,
+# caches of data derived from a dataset should include it in their keys.
+class DatasetRegistry:
+
+    def __init__(self):
+        self.sources = {}
+        self.loaders = {}
+        self.frames = {}
+        self.hashes = {}
+        self.locks = {}
+
+        # Datasets replaced with set(), they no longer match their source file
+        self.replaced = set()
+
+    # Register a dataset, the loader gets the registry and returns the frame
+    def register(self, name, source, loader):
+        self.sources[name] = source
+        self.loaders[name] = loader
+        self.locks[name] = threading.RLock()
+
+    # Copy-on-write view of the dataset, loaded on first access (concurrent requests wait for the same load)
+    def get(self, name):
+        frame = self.frames.get(name)
+        if frame is None:
+            with self.locks[name]:
+                frame = self.frames.get(name)
+                if frame is None:
+                    frame = self.loaders[name](self)
+                    self.frames[name] = frame
+        return frame.copy(deep=False)
+
+    # Replace the loaded dataset, e.g. by a scaled copy in the benchmarks
+    def set(self, name, frame):
+        with self.locks[name]:
+            self.frames[name] = frame
+            self.replaced.add(name)
+
+    # True while the dataset is the one of its source file, only then snapshots keyed on the
+    # content hash of the file can stand in for it
+    def from_source(self, name):
+        return name not in self.replaced
+
+    # Source file of the dataset
+    def source(self, name):
+        return self.sources[name]
+
+    # Content hash of the source file, computed once
+    def content_hash(self, name):
+        source = self.sources[name]
+        if source not in self.hashes:
+            self.hashes[source] = file_hash(source)
+        return self.hashes[source]
+
+    # Short version of the dataset for cache keys
+    def version(self, name):
+        return self.content_hash(name)[:16]
+
+    # Empty registry with the same datasets, used to load a new version next to the current one
+    def staged(self):
+        staged = DatasetRegistry()
+        for name in self.loaders:
+            staged.register(name, self.sources[name], self.loaders[name])
+        return staged
+
+    # Load every dataset that is not loaded yet
+    def load_all(self):
+        for name in self.loaders:
+            self.get(name)
+
+    # Forget the loaded datasets and hashes, they are loaded again on the next access
+    def clear(self):
+        for name in self.loaders:
+            with self.locks[name]:
+                self.frames.pop(name, None)
+                self.replaced.discard(name)
+        self.hashes = {}
+
+
+# Original register with the index shown in the explore table
+def load_original(registry):
+    df = pd.read_csv(registry.source('original'))
+    df[' index'] = range(1, len(df) + 1)
+    return compact_frame(df, ORIGINAL_SCHEMA)
+
+
+# Preprocessed register, built from the loaded original (or loaded from the snapshot cache)
+def load_explore(registry):
+    from datasetPreprocessingExplore import load_preprocessed_dataset
+
+    df = load_preprocessed_dataset(registry.source('explore'), lambda file_path: registry.get('original'),
+                                   content_hash=registry.content_hash('explore'))
+    return compact_frame(df, CLEANED_SCHEMA)
+
+
+# Cleaned register of the insights and network pages
+def load_cleaned(registry):
+    return pd.read_csv(registry.source('cleaned'))
+
+
+datasets = DatasetRegistry()
+datasets.register('original', ORIGINAL_DATASET, load_original)
+datasets.register('explore', ORIGINAL_DATASET, load_explore)
+datasets.register('cleaned', CLEANED_DATASET, load_cleaned)
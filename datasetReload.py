@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from datasetCache import CACHE_DIR, atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two checks of the dataset files (0 disables the check, triggered reloads still run)
+RELOAD_INTERVAL = float(os.environ.get('DATASET_RELOAD_INTERVAL', 30))
+
+# Reloads are requested through a trigger file, so a request to any worker process reaches the process
+# that watches the datasets. That process stores the outcome in the status file for all workers.
+RELOAD_TRIGGER_PATH = os.path.join(CACHE_DIR, 'reload-trigger.json')
+RELOAD_STATUS_PATH = os.path.join(CACHE_DIR, 'reload-status.json')
+
+# Seconds between two checks of the trigger file
+TRIGGER_INTERVAL = 1.0
+
+
+# Size and modification time of the source files, a new file shows up as a change of either
+def source_stamps(registry):
+    stamps = {}
+    for source in set(registry.sources.values()):
+        try:
+            stat = os.stat(source)
+            stamps[source] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            stamps[source] = None
+    return stamps
+
+
+# Content of a JSON file written by the reloader, empty if there is none (yet)
+def read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json(path, content):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+
+    atomic_write(path, write)
+
+
+# Reloads the datasets without a restart. A new version is loaded into a staged registry in a background
+# thread while the current version keeps serving, `apply` gets the loaded staged registry, builds what depends
+# on it and swaps it in. The staged registry is the current one from then on, the next reload compares with it.
+# A failed reload (e.g. a half written CSV) is logged and the current version is kept.
+# Only the process that runs the watcher reloads, other processes request a reload with request_reload.
+class DatasetReloader:
+
+    def __init__(self, registry, apply, interval=RELOAD_INTERVAL, trigger_path=RELOAD_TRIGGER_PATH,
+                 status_path=RELOAD_STATUS_PATH):
+        self.registry = registry
+        self.apply = apply
+        self.interval = interval
+        self.trigger_path = trigger_path
+        self.status_path = status_path
+        self.stamps = source_stamps(registry)
+
+        # Trigger handled last, a trigger written before the start is not handled again
+        self.trigger = read_json(trigger_path).get('id')
+        self.lock = threading.Lock()
+        self.watcher = None
+        self.reloads = 0
+        self.last_error = None
+
+        # Background reload and the reload requested while it runs (None, or its force flag)
+        self.worker = None
+        self.pending = None
+        self.pending_lock = threading.Lock()
+
+    # Load and apply the datasets again, unless their content did not change. Only one reload runs at a time.
+    def reload(self, force=False):
+        with self.lock:
+            stamps = source_stamps(self.registry)
+            try:
+                staged = self.registry.staged()
+                if not force and all(staged.content_hash(name) == self.registry.content_hash(name) for name in staged.loaders):
+                    self.stamps = stamps
+                    return False
+                staged.load_all()
+                self.apply(staged)
+            except Exception as error:
+                logger.exception('Reloading the datasets failed, keeping the current version')
+                self.last_error = repr(error)
+                self.save_status()
+                return False
+            self.registry = staged
+            self.stamps = stamps
+            self.reloads += 1
+            self.last_error = None
+            self.save_status()
+            return True
+
+    # Request a reload from the watching process (of any process sharing the dataset folder). A forced
+    # request that was not handled yet stays forced.
+    def request_reload(self, force=False):
+        trigger = read_json(self.trigger_path)
+        if trigger and trigger.get('id') != read_json(self.status_path).get('trigger'):
+            force = force or trigger.get('force', False)
+        write_json(self.trigger_path, {'id': uuid.uuid4().hex, 'force': force})
+
+    # Reload in a background thread, e.g. for a trigger. Triggers while a reload runs are combined
+    # into one more reload once it finished (forced if any of them was).
+    # Returns False when the trigger joined an already pending reload.
+    def start_reload(self, force=False):
+        with self.pending_lock:
+            if self.pending is not None and self.worker is not None and self.worker.is_alive():
+                self.pending = self.pending or force
+                return False
+            self.pending = force
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run_pending, name='dataset-reload', daemon=True)
+                self.worker.start()
+        return True
+
+    # Run the requested reloads until none is pending
+    def run_pending(self):
+        while True:
+            with self.pending_lock:
+                force, self.pending = self.pending, None
+                if force is None:
+                    self.worker = None
+                    return
+            self.reload(force)
+
+    # Reload when the trigger file changed, and check the source files every `interval` seconds. Threads do
+    # not survive a fork, with several worker processes the master watches (see productionServer.py).
+    def start_watching(self):
+        if self.watcher is not None and self.watcher.is_alive():
+            return None
+        self.save_status()
+
+        def run():
+            checked = time.monotonic()
+            while True:
+                time.sleep(TRIGGER_INTERVAL)
+                trigger = read_json(self.trigger_path)
+                if trigger.get('id') not in (None, self.trigger):
+                    self.trigger = trigger['id']
+                    self.start_reload(force=trigger.get('force', False))
+                elif self.interval > 0 and self.worker is None and time.monotonic() - checked >= self.interval:
+                    checked = time.monotonic()
+                    if source_stamps(self.registry) != self.stamps:
+                        self.start_reload()
+
+        self.watcher = threading.Thread(target=run, name='dataset-watcher', daemon=True)
+        self.watcher.start()
+        return self.watcher
+
+    # Reload counter, the error of the last failed reload, the versions and the trigger handled last
+    def status(self):
+        return {'reloads': self.reloads, 'last_error': self.last_error, 'trigger': self.trigger, 'pid': os.getpid(),
+                'versions': {name: self.registry.version(name) for name in self.registry.loaders}}
+
+    # Status of the watching process, for processes that do not reload themselves
+    def shared_status(self):
+        return read_json(self.status_path) or self.status()
+
+    def save_status(self):
+        try:
+            write_json(self.status_path, self.status())
+        except OSError:
+            logger.exception('Storing the reload status failed')
@@ -0,0 +1,123 @@
+import glob
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from datasetCache import CACHE_DIR, atomic_write, load_or_build_snapshot, snapshot_key, snapshot_path
+
+# Incremental snapshots: next to every snapshot the register number and a hash of every raw row are stored.
+# When the register is republished, only rows that are new or whose hash changed are processed again
+# and merged into the previous snapshot, unchanged rows are taken from it as they are.
+
+# Entries are identified by their register number
+KEY_COLUMN = 'RegNr'
+
+
+# Path of the row hashes of a snapshot, the code version is part of the name so only matching snapshots are reused
+def rows_path(path, code_version):
+    return f'{path[:-len(".parquet")]}.v{code_version}.rows.parquet'
+
+
+# Hash of every row over all columns except the ignored ones (e.g. a position in the file). Text hashes
+# the same as object, categorical or Arrow string, numbers are hashed as float64 so compact dtypes do not matter.
+def row_hashes(raw, ignore_columns=()):
+    frame = raw[[column for column in raw.columns if column not in ignore_columns]]
+    frame = frame.astype(dict.fromkeys(frame.select_dtypes('number').columns, np.float64))
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def save_row_hashes(path, keys, hashes):
+    try:
+        atomic_write(path, pd.DataFrame({KEY_COLUMN: keys.to_numpy(), 'row_hash': hashes}).to_parquet)
+    except (ImportError, OSError, ValueError):
+        pass
+
+
+# Most recent snapshot of the same source file and code version, with its row hashes (None if there is none).
+# Hashes of a register with duplicate entries can not be matched by key, its snapshot is not used.
+def load_previous(file_path, code_version, cache_dir=CACHE_DIR):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    candidates = glob.glob(os.path.join(glob.escape(cache_dir), f'{glob.escape(name)}-*.v{code_version}.rows.parquet'))
+    for path in sorted(candidates, key=os.path.getmtime, reverse=True):
+        previous_path = path[:-len(f'.v{code_version}.rows.parquet')] + '.parquet'
+        try:
+            previous_rows = pd.read_parquet(path)
+            if not previous_rows[KEY_COLUMN].is_unique:
+                return None
+            return pd.read_parquet(previous_path), previous_rows
+        except (ImportError, OSError, ValueError, KeyError):
+            continue
+    return None
+
+
+# Added and changed rows of the raw register compared to the stored row hashes
+def changed_rows(raw, hashes, previous_rows):
+    previous_hashes = pd.Series(previous_rows['row_hash'].to_numpy(), index=previous_rows[KEY_COLUMN])
+    return ~(raw[KEY_COLUMN].map(previous_hashes).to_numpy() == hashes)
+
+
+# Merge the processed added and changed rows into the previous snapshot. The merged rows are in the
+# order of the register (rows of an entry keep their order), `finalize` gets them with their positions.
+def merge_delta(raw, changed, previous, process, finalize):
+    positions = pd.Series(np.arange(len(raw)), index=raw[KEY_COLUMN])
+
+    kept = previous[previous[KEY_COLUMN].isin(raw.loc[~changed, KEY_COLUMN])]
+    processed = process(raw[changed])
+    merged = pd.concat([kept, processed], ignore_index=True) if len(processed) else kept.reset_index(drop=True)
+
+    order = merged[KEY_COLUMN].map(positions).to_numpy()
+    sort = np.argsort(order, kind='stable')
+    return finalize(merged.iloc[sort].reset_index(drop=True), order[sort])
+
+
+# Load the snapshot of the source file, or build it. With a stored snapshot of an earlier version of the file
+# only the added and changed rows are processed. `process` turns raw rows into snapshot rows (row by row, it
+# must keep the key column) and `finalize` restores what depends on the whole register, e.g. the sort order.
+def load_or_update_snapshot(file_path, load_raw, process, code_version, finalize=lambda df, positions: df,
+                            ignore_columns=(), cache_dir=CACHE_DIR, content_hash=None):
+    built = {}
+
+    def build(path):
+        raw = load_raw(path)
+        hashes = row_hashes(raw, ignore_columns)
+        built['keys'], built['hashes'] = raw[KEY_COLUMN], hashes
+
+        previous = load_previous(path, code_version, cache_dir) if raw[KEY_COLUMN].is_unique else None
+        if previous is None:
+            return process(raw)
+        changed = changed_rows(raw, hashes, previous[1])
+        return merge_delta(raw, changed, previous[0], process, finalize)
+
+    df = load_or_build_snapshot(file_path, build, code_version, cache_dir, content_hash)
+
+    # Row hashes of the new snapshot, the previous snapshot was evicted with its hashes
+    if built:
+        key = snapshot_key(file_path, code_version, content_hash)
+        save_row_hashes(rows_path(snapshot_path(file_path, key, cache_dir), code_version), built['keys'], built['hashes'])
+    return df
+
+
+# Number of added, changed, removed and unchanged entries of a register compared to its stored snapshot
+def delta_report(file_path, code_version, ignore_columns=(), cache_dir=CACHE_DIR):
+    previous = load_previous(file_path, code_version, cache_dir)
+    if previous is None:
+        return None
+    raw = pd.read_csv(file_path)
+    previous_rows = previous[1]
+    changed = changed_rows(raw, row_hashes(raw, ignore_columns), previous_rows)
+    known = raw[KEY_COLUMN].isin(previous_rows[KEY_COLUMN]).to_numpy()
+    return {
+        'added': int((~known).sum()),
+        'changed': int((changed & known).sum()),
+        'removed': int((~previous_rows[KEY_COLUMN].isin(raw[KEY_COLUMN])).sum()),
+        'unchanged': int((~changed).sum()),
+    }
+
+
+if __name__ == '__main__':
+    from datasetPreprocessingExplore import PREPROCESSING_VERSION
+
+    file_path = sys.argv[1] if len(sys.argv) > 1 else 'Datasets/Lobbyregister2024_full.csv'
+    print(delta_report(file_path, PREPROCESSING_VERSION, ignore_columns=(' index',)) or 'No snapshot of this register yet')
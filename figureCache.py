@@ -0,0 +1,60 @@
+import json
+import os
+import shutil
+
+from datasetCache import atomic_write
+
+# Serialized figures, one folder per dataset version (ignored by git)
+FIGURE_CACHE_DIR = 'Datasets/cache/figures'
+
+
+# Path of a figure for a dataset version and figure builder version
+def figure_path(name, version, dataset_hash, cache_dir=FIGURE_CACHE_DIR):
+    return os.path.join(cache_dir, dataset_hash, f'{name}-v{version}.json')
+
+
+# Load the figure JSON from the cache, or build the figure and store it for other workers and restarts
+def load_or_build_figure(name, builder, version, dataset_hash, cache_dir=FIGURE_CACHE_DIR):
+    path = figure_path(name, version, dataset_hash, cache_dir)
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            # Dash accepts the figure as a plain dict, no need to validate it again as go.Figure
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    figure = builder()
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(figure.to_json())
+
+    try:
+        atomic_write(path, write)
+        evict_figure_versions(name, path)
+    except OSError:
+        pass
+
+    return figure
+
+
+# Remove older builder versions of a figure
+def evict_figure_versions(name, keep):
+    folder = os.path.dirname(keep)
+    for entry in os.listdir(folder):
+        path = os.path.join(folder, entry)
+        if entry.startswith(f'{name}-v') and entry.endswith('.json') and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Remove the figures of all dataset versions that are no longer active
+def evict_figures(active_hashes, cache_dir=FIGURE_CACHE_DIR):
+    if not os.path.isdir(cache_dir):
+        return
+    for entry in os.listdir(cache_dir):
+        if entry not in active_hashes:
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
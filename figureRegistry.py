@@ -0,0 +1,88 @@
+import threading
+import time
+
+from figureCache import evict_figures, load_or_build_figure
+
+
+# Figures are built on first access instead of at import, so a worker can serve requests right away.
+# With a dataset hash the figures are also stored on disk and shared across workers and restarts.
+class FigureRegistry:
+
+    def __init__(self, dataset_hash=None):
+        self.dataset_hash = dataset_hash
+        self.builders = {}
+        self.versions = {}
+        self.figures = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+        # Set once all figures were built by a warm-up
+        self.warmed_up = threading.Event()
+        self.warm_up_thread = None
+
+        # Set once a newer dataset version replaced this one
+        self.retired = False
+
+        # Figures of other dataset versions are not needed anymore
+        if dataset_hash is not None:
+            evict_figures([dataset_hash])
+
+    # Register a function that builds the figure, increase the version whenever the builder changes its output
+    def register(self, name, builder, version=1):
+        self.builders[name] = builder
+        self.versions[name] = version
+        self.locks[name] = threading.Lock()
+
+    # Figure by name, built on first access (concurrent requests wait for the same build)
+    def get(self, name):
+        figure = self.figures.get(name)
+        if figure is not None:
+            return figure
+        with self.locks[name]:
+            figure = self.figures.get(name)
+            if figure is None:
+                figure = self.build(name)
+                self.figures[name] = figure
+        return figure
+
+    # Build the figure, or load it from the figure cache
+    def build(self, name):
+        if self.dataset_hash is None or self.retired:
+            return self.builders[name]()
+        return load_or_build_figure(name, self.builders[name], self.versions[name], self.dataset_hash)
+
+    # Build the given figures (all registered figures by default)
+    def warm_up(self, names=None):
+        for name in names or list(self.builders):
+            self.get(name)
+        if names is None:
+            self.warmed_up.set()
+
+    # Build the figures in a background thread, the delay gives the server time to start listening.
+    # A warm-up of all figures is only started once.
+    def start_warm_up(self, names=None, delay=1.0):
+        if names is None and (self.warm_up_thread is not None or self.warmed_up.is_set()):
+            return self.warm_up_thread
+
+        def run():
+            time.sleep(delay)
+            self.warm_up(names)
+
+        with self.lock:
+            if names is None and self.warm_up_thread is not None:
+                return self.warm_up_thread
+            thread = threading.Thread(target=run, name='figure-warm-up', daemon=True)
+            if names is None:
+                self.warm_up_thread = thread
+        thread.start()
+        return thread
+
+    # Stop storing figures on disk, the cache folder of this dataset version is evicted by the next version.
+    # Requests in flight still get their figures, built from the datasets of this version.
+    def retire(self):
+        self.retired = True
+
+    # Drop all built figures, they are rebuilt on the next access
+    def clear(self):
+        with self.lock:
+            self.figures = {}
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+# Values of the explore filter dropdowns, the fiscal years are taken from the data
+EMPLOYEE_THRESHOLDS = {1: 5, 2: 10, 3: 50, 4: 100}
+SPENDING_THRESHOLDS = {1: 5000, 2: 10000, 3: 50000, 4: 100000, 5: 500000, 6: 1000000}
+SPENDING_PER_EMPLOYEE_THRESHOLDS = {1: 1000, 2: 5000, 3: 10000, 4: 50000, 5: 100000}
+
+
+# Row masks for every dropdown value of the cleaned table, computed once when the data is loaded.
+# A query is an AND of the masks of the selected values followed by a single take of the rows.
+class FilterIndex:
+
+    def __init__(self, df):
+        self.df = df
+        self.all_rows = np.arange(len(df))
+
+        # Start years of the fiscal years in the register, the values of the fiscal year dropdown
+        years = df['Fiscal Year Start'].dt.year
+        self.fiscal_years = sorted(int(year) for year in years.dropna().unique())
+        years = years.to_numpy()
+        self.years = {year: years == year for year in self.fiscal_years}
+
+        self.employees = self.threshold_masks(df['Ø Employees'], EMPLOYEE_THRESHOLDS)
+        self.spending = self.threshold_masks(df['Ø Amount'], SPENDING_THRESHOLDS)
+        self.spending_per_employee = self.threshold_masks(df['Ø Amount/Employee'], SPENDING_PER_EMPLOYEE_THRESHOLDS)
+
+        codes, entities = pd.factorize(df['Entity'])
+        self.entities = {entity: codes == code for code, entity in enumerate(entities)}
+
+    @staticmethod
+    def threshold_masks(values, thresholds):
+        values = values.to_numpy()
+        return {value: values > threshold for value, threshold in thresholds.items()}
+
+    # Row positions matching all selected dropdown values (None means not filtered)
+    def select(self, year=None, employees=None, spending=None, spending_per_employee=None, entity=None):
+        masks = []
+        if year:
+            masks.append(self.years.get(year, np.zeros(len(self.df), dtype=bool)))
+        if employees:
+            masks.append(self.employees[employees])
+        if spending:
+            masks.append(self.spending[spending])
+        if spending_per_employee:
+            masks.append(self.spending_per_employee[spending_per_employee])
+        if entity:
+            # Ensure entity is treated as a list, rows of any of the entities match
+            entities = [entity] if isinstance(entity, str) else entity
+            entity_mask = np.zeros(len(self.df), dtype=bool)
+            for name in entities:
+                if name in self.entities:
+                    entity_mask |= self.entities[name]
+            masks.append(entity_mask)
+
+        if not masks:
+            return self.all_rows
+        return np.flatnonzero(np.logical_and.reduce(masks))
+
+    # Selected columns of the selected rows, copied in a single take
+    def take(self, rows, columns):
+        return self.df.iloc[rows, self.df.columns.get_indexer(columns)]
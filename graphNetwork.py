@@ -1,85 +1,43 @@
-# Import Libraries
-import networkx as nx
-import pandas as pd 
-import matplotlib.pyplot as plt
+# Import Libraries (networkx is imported when a network is built, it is slow to import)
+import numpy as np
 import plotly.graph_objects as go
-from datasetPreprocessingInsights import dfTIG, dfEntities
-
-# Network Superinterrest
-def createNetworkInterests() :
-
-    df = dfTIG()
-
-    # Create an empty graph
-    GI = nx.Graph()
-
-    # Add nodes with attributes from the dataset
-    for index, row in df.iterrows():
-        # Assuming 'Entity' is a column in your DataFrame for node names
-        # Add or update node for EntityA
-        if not GI.has_node(row['Tätigkeit']):
-            GI.add_node(row['Tätigkeit'])
-        else:
-            # Update node attributes if necessary
-            pass
-
-        # Add or update node for EntityB
-        if not GI.has_node(row['Supercategory']):
-            GI.add_node(row['Supercategory'])
-        else:
-            # Update node attributes if necessary
-            pass
-
-        # Add edges between EntityA and EntityB
-        # This assumes each row in your DataFrame represents a relationship between EntityA and EntityB
-        GI.add_edge(row['Tätigkeit'], row['Supercategory'])
-
-    return GI
-
-def plotlyNetworkInterests(GI):
-    pos = nx.spring_layout(GI)  # Generate layout for nodes
-
-    # Edge trace
-    edge_x = []
-    edge_y = []
-    for edge in GI.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-
-    edge_trace = go.Scatter(
-        x=edge_x, y=edge_y,
+from datasetPreprocessingInsights import dfTIG, dfInterests
+from datasetRegistry import datasets
+from networkLayout import load_or_compute_layout
+
+# Above this number of nodes or edges the traces are drawn with WebGL, SVG gets too slow in the browser
+WEBGL_THRESHOLD = 1000
+
+# Edge and node traces of a network, built with array operations instead of per node/edge loops
+def networkTraces(G, pos):
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    positions = np.array([pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+    edges = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.intp).reshape(-1, 2)
+
+    # Edge segments (start, end, NaN separator) gathered from the position matrix
+    segments = np.full((len(edges), 3, 2), np.nan)
+    segments[:, 0] = positions[edges[:, 0]]
+    segments[:, 1] = positions[edges[:, 1]]
+
+    # Normalize node degrees to [0,1] for the colorscale (all 0 if every node has the same degree)
+    degrees = np.array([degree for _, degree in G.degree(nodes)], dtype=float)
+    degree_range = degrees.max() - degrees.min() if len(degrees) else 0
+    node_color = (degrees - degrees.min()) / degree_range if degree_range else np.zeros(len(degrees))
+
+    Scatter = go.Scattergl if max(len(nodes), len(edges)) > WEBGL_THRESHOLD else go.Scatter
+
+    edge_trace = Scatter(
+        x=segments[:, :, 0].ravel(), y=segments[:, :, 1].ravel(),
         line=dict(width=0.5, color='blue'),
         hoverinfo='none',
         mode='lines')
 
-    # Node trace
-    node_x = []
-    node_y = []
-    text = []
-    node_color = []  # Store colors for each node
-
-    # Calculate degree for each node and use it for coloring
-    degrees = dict(GI.degree())
-    max_degree = max(degrees.values())
-    min_degree = min(degrees.values())
-    # Normalize node degrees to map to colorscale
-    for node in GI.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        text.append(node)
-        node_degree = degrees[node]
-        # Normalize degree to [0,1] for colorscale
-        normalized_degree = (node_degree - min_degree) / (max_degree - min_degree)
-        node_color.append(normalized_degree)
-
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
+    node_trace = Scatter(
+        x=positions[:, 0], y=positions[:, 1],
         mode='markers',
         hoverinfo='text',
-        text=text,
+        text=nodes,
         marker=dict(
             showscale=True,
             colorscale='YlGnBu',
@@ -93,6 +51,32 @@ def plotlyNetworkInterests(GI):
             ),
             line_width=2))
 
+    return edge_trace, node_trace
+
+# Network Superinterrest
+def createNetworkInterests(registry=datasets) :
+    import networkx as nx
+
+    df = dfTIG(registry)
+
+    # One edge per entity type and supercategory, weighted by the number of entities with that interest
+    edges = df[['Tätigkeit', 'Supercategory', 'Count']].rename(columns={'Count': 'weight'})
+
+    # Create the graph from the edge list in one go
+    GI = nx.from_pandas_edgelist(edges, 'Tätigkeit', 'Supercategory', edge_attr='weight')
+
+    # Entity types and supercategories are the two sides of the graph
+    entities = set(edges['Tätigkeit'])
+    nx.set_node_attributes(GI, {node: int(node not in entities) for node in GI.nodes()}, 'bipartite')
+
+    return GI
+
+def plotlyNetworkInterests(GI):
+    pos = load_or_compute_layout(GI, 'interests')  # Generate layout for nodes (cached as long as the graph does not change)
+
+    # Edge and node traces
+    edge_trace, node_trace = networkTraces(GI, pos)
+
     # Figure setup
     figInterests = go.Figure(data=[edge_trace, node_trace],
                     layout=go.Layout(
@@ -110,109 +94,29 @@ def plotlyNetworkInterests(GI):
 # Network Entities
 
 # Network Superinterrest
-def createNetworkEntities() :
-
-    # Read cleaned dataset
-    filepath = 'Datasets/cleanedLobbyregister2024.csv'
-    cleanedDataset = pd.read_csv(filepath)
-
-    # Split the values in "Interessen- und Vorhabenbereiche" column and create new rows
-    df = cleanedDataset.copy()
+def createNetworkEntities(registry=datasets) :
+    import networkx as nx
 
-    df['Interessen'] = cleanedDataset['Interessen'].str.split('; ')
-    df = df.explode('Interessen')
+    # One row per entity and interest
+    df = dfInterests(registry)
 
-    # Group by "Tätigkeit" and count the number of unique "Interessen" for each
-    taetigkeit_interessen_counts = df.groupby('Tätigkeit')['Interessen'].nunique().reset_index()
-    taetigkeit_interessen_counts.columns = ['Tätigkeit', 'Unique_Interessen_Count']
+    # Deduplicated edges between entity types and interests, weighted by how often they occur together
+    edges = df.groupby(['Tätigkeit', 'Interessen'], observed=True, sort=False).size().reset_index(name='weight')
 
-    #taetigkeit_interessen_counts['short_entity'] = [truncate_label(label) for label in taetigkeit_interessen_counts['Tätigkeit']]
+    # Create the graph from the edge list in one go
+    GE = nx.from_pandas_edgelist(edges, 'Tätigkeit', 'Interessen', edge_attr='weight')
 
-    # Create an empty graph
-    GE = nx.Graph()
-
-    # Add nodes with attributes from the dataset
-    for index, row in df.iterrows():
-        # Assuming 'Entity' is a column in your DataFrame for node names
-        # Add or update node for EntityA
-        if not GE.has_node(row['Tätigkeit']):
-            GE.add_node(row['Tätigkeit'])
-        else:
-            # Update node attributes if necessary
-            pass
-
-        # Add or update node for EntityB
-        if not GE.has_node(row['Interessen']):
-            GE.add_node(row['Interessen'])
-        else:
-            # Update node attributes if necessary
-            pass
-
-        # Add edges between EntityA and EntityB
-        # This assumes each row in your DataFrame represents a relationship between EntityA and EntityB
-        GE.add_edge(row['Tätigkeit'], row['Interessen'])
+    # Entity types and interests are the two sides of the graph
+    entities = set(edges['Tätigkeit'])
+    nx.set_node_attributes(GE, {node: int(node not in entities) for node in GE.nodes()}, 'bipartite')
 
     return GE
 
 def plotlyNetworkEntities(GE):
-    pos = nx.spring_layout(GE)  # Generate layout for nodes
-
-    # Edge trace
-    edge_x = []
-    edge_y = []
-    for edge in GE.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-
-    edge_trace = go.Scatter(
-        x=edge_x, y=edge_y,
-        line=dict(width=0.5, color='blue'),
-        hoverinfo='none',
-        mode='lines')
+    pos = load_or_compute_layout(GE, 'entities')  # Generate layout for nodes (cached as long as the graph does not change)
 
-    # Node trace
-    node_x = []
-    node_y = []
-    text = []
-    node_color = []  # Store colors for each node
-
-    # Calculate degree for each node and use it for coloring
-    degrees = dict(GE.degree())
-    max_degree = max(degrees.values())
-    min_degree = min(degrees.values())
-    # Normalize node degrees to map to colorscale
-    for node in GE.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        text.append(node)
-        node_degree = degrees[node]
-        # Handle zero division error
-        if max_degree - min_degree != 0:
-            normalized_degree = (node_degree - min_degree) / (max_degree - min_degree)
-        else:
-            normalized_degree = 0
-        node_color.append(normalized_degree)
-
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers',
-        hoverinfo='text',
-        text=text,
-        marker=dict(
-            showscale=True,
-            colorscale='YlGnBu',
-            color=node_color,
-            size=10,
-            colorbar=dict(
-                thickness=20,
-                title='Node Degree',
-                xanchor='left',
-                titleside='right'
-            ),
-            line_width=2))
+    # Edge and node traces
+    edge_trace, node_trace = networkTraces(GE, pos)
 
     # Figure setup
     figEntities = go.Figure(data=[edge_trace, node_trace],
@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+
+from datasetCache import atomic_write
+
+# Stored interest maps, one per register, next to the dataset snapshots (ignored by git)
+INTEREST_MAP_DIR = 'Datasets/cache'
+
+
+# Path of the stored interest map of a register, e.g. the name of its file
+def interest_map_path(scope):
+    return os.path.join(INTEREST_MAP_DIR, f'interest_map-{scope}.json')
+
+
+# BK-tree over the Levenshtein distance, finds all interests within a distance without comparing against every interest
+class BKTree:
+
+    def __init__(self):
+        # Imported here, the tree is only needed when new interests show up
+        from Levenshtein import distance
+
+        self.distance = distance
+        self.root = None
+        self.size = 0
+
+    def add(self, word):
+        # Nodes are [word, insertion order, children by distance]
+        node = [word, self.size, {}]
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = self.distance(word, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    # Closest word within max_distance, ties go to the word added first (None if there is no such word).
+    # With `before` only the words added before that position are considered.
+    def closest(self, word, max_distance, before=None):
+        if self.root is None:
+            return None
+        best = None
+        stack = [self.root]
+        while stack:
+            current, order, children = stack.pop()
+            distance = self.distance(word, current)
+            if distance <= max_distance and (before is None or order < before) and (best is None or (distance, order) < best[:2]):
+                best = (distance, order, current)
+            # Only children in [distance - max_distance, distance + max_distance] can contain matches
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return best[2] if best else None
+
+
+# Homogenized interests, keeps the BK-tree of all known interests next to the interest map
+class InterestIndex:
+
+    def __init__(self, max_distance=2, canonical=()):
+        self.max_distance = max_distance
+        self.interest_map = {}
+        self.tree = BKTree()
+        self.lock = threading.Lock()
+
+        # Official spellings (e.g. the interests of the supercategories) are added first,
+        # so variants found in a register are mapped to them and never the other way around
+        self.canonical = list(dict.fromkeys(canonical))
+        for interest in self.canonical:
+            self.interest_map[interest] = interest
+            self.tree.add(interest)
+
+    # Map every interest that has not been seen before, interests closer than max_distance
+    # to a known interest are mapped to the same homogenized interest
+    def update(self, interests, workers=1):
+        with self.lock:
+            # NaN and other missing values are kept as they are
+            new = [interest for interest in dict.fromkeys(interests)
+                   if isinstance(interest, str) and interest not in self.interest_map]
+            if workers > 1 and len(new) >= PARALLEL_MIN_INTERESTS:
+                matches = self.match_parallel(new, workers)
+            else:
+                matches = None
+
+            for i, interest in enumerate(new):
+                match = matches[i] if matches is not None else self.tree.closest(interest, self.max_distance - 1)
+                self.interest_map[interest] = self.interest_map[match] if match is not None else interest
+                self.tree.add(interest)
+        return bool(new)
+
+    # Closest earlier interest of every new interest, searched in worker processes. Every worker builds the
+    # tree of the known and the new interests and only considers words added before the searched one,
+    # so the matches are the ones of the serial update. Resolving them to homogenized interests stays serial.
+    def match_parallel(self, new, workers):
+        from parallelPreprocessing import PARTITIONS_PER_WORKER, map_in_processes
+
+        known = len(self.interest_map)
+        bounds = [len(new) * i // (workers * PARTITIONS_PER_WORKER) for i in range(workers * PARTITIONS_PER_WORKER + 1)]
+        partitions = [(known + start, new[start:end], self.max_distance - 1) for start, end in zip(bounds[:-1], bounds[1:])]
+        results = map_in_processes(_match_partition, partitions, workers,
+                                   initializer=_init_worker_tree, initargs=([*self.interest_map, *new],))
+        return [match for result in results for match in result]
+
+    # Load the stored interest map, the BK-tree is rebuilt in the stored order
+    def load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        if stored.get('max_distance') != self.max_distance or stored.get('canonical') != self.canonical:
+            return
+        with self.lock:
+            for interest, homogenized in stored['interests']:
+                if interest not in self.interest_map:
+                    self.interest_map[interest] = homogenized
+                    self.tree.add(interest)
+
+    # Store the interest map
+    def save(self, path):
+        with self.lock:
+            interests = list(self.interest_map.items())
+
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'max_distance': self.max_distance, 'canonical': self.canonical, 'interests': interests},
+                          f, ensure_ascii=False)
+
+        try:
+            atomic_write(path, write)
+        except OSError:
+            pass
+
+
+# Interests matched serially below this number, starting worker processes takes longer
+PARALLEL_MIN_INTERESTS = 2000
+
+# Tree of the worker processes of match_parallel
+_worker_tree = None
+
+
+def _init_worker_tree(words):
+    global _worker_tree
+    _worker_tree = BKTree()
+    for word in words:
+        _worker_tree.add(word)
+
+
+def _match_partition(partition):
+    start, words, max_distance = partition
+    return [_worker_tree.closest(word, max_distance, before=start + i) for i, word in enumerate(words)]
+
+
+_indexes = {}
+_index_lock = threading.Lock()
+
+
+# Interest index of a register, loaded from disk on first use. Without a scope the index is neither
+# shared nor stored (e.g. for frames that do not belong to a register file).
+def get_interest_index(scope=None, canonical=()):
+    if scope is None:
+        return InterestIndex(canonical=canonical)
+    key = (scope, tuple(canonical))
+    with _index_lock:
+        if key not in _indexes:
+            index = InterestIndex(canonical=canonical)
+            index.load(interest_map_path(scope))
+            _indexes[key] = index
+        return _indexes[key]
+
+
+# A function to homogenize the interests, only interests that are not in the stored map are matched.
+# Every register (scope) has its own map, spellings of one register do not decide those of another.
+def homogenize_interests(interests, workers=1, scope=None, canonical=()):
+    index = get_interest_index(scope, canonical)
+    if index.update(interests, workers) and scope is not None:
+        index.save(interest_map_path(scope))
+    return {interest: index.interest_map.get(interest, interest) for interest in interests}
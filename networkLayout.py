@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+
+from datasetCache import atomic_write
+
+# Node positions, stored next to the dataset snapshots (ignored by git)
+LAYOUT_DIR = 'Datasets/cache/layouts'
+
+# Fixed seed, the network looks the same after every deploy
+LAYOUT_SEED = 42
+
+# Increase whenever compute_layout changes its output
+LAYOUT_VERSION = 1
+
+
+# Hash of the graph structure, the layout is reused as long as nodes and edges stay the same
+def graph_hash(G):
+    sha = hashlib.sha256()
+    sha.update(f'v{LAYOUT_VERSION}-{LAYOUT_SEED}'.encode())
+    for node in sorted(map(str, G.nodes())):
+        sha.update(node.encode())
+        sha.update(b'\0')
+    sha.update(b'\1')
+    for edge in sorted(tuple(sorted(map(str, edge))) for edge in G.edges()):
+        sha.update('\0'.join(edge).encode())
+        sha.update(b'\1')
+    return sha.hexdigest()[:16]
+
+
+# Seeded force directed layout. Bipartite graphs (node attribute 'bipartite' as in networkx.bipartite)
+# start from two circles, the entity types inside and their interests outside. networkx switches to the
+# sparse Fruchterman-Reingold solver on its own for large graphs.
+def compute_layout(G):
+    import networkx as nx
+
+    entities = [node for node, side in G.nodes(data='bipartite') if side == 0]
+    others = [node for node, side in G.nodes(data='bipartite') if side != 0]
+
+    initial = None
+    if entities and others:
+        initial = nx.shell_layout(G, nlist=[entities, others])
+
+    return nx.spring_layout(G, pos=initial, weight=None, seed=LAYOUT_SEED)
+
+
+# Positions of the graph nodes, loaded from disk when the graph did not change. Only the layout of the
+# current graph of a name (e.g. 'interests') is kept.
+def load_or_compute_layout(G, name, layout_dir=LAYOUT_DIR):
+    path = os.path.join(layout_dir, f'{name}-{graph_hash(G)}.json')
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            stored = json.load(f)
+        return {node: stored[str(node)] for node in G.nodes()}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    pos = compute_layout(G)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({str(node): [float(x), float(y)] for node, (x, y) in pos.items()}, f, ensure_ascii=False)
+
+    try:
+        atomic_write(path, write)
+        evict_layouts(name, path)
+    except OSError:
+        pass
+
+    return pos
+
+
+# Remove the layouts of earlier graphs of the same name (and layouts stored before they had names)
+def evict_layouts(name, keep):
+    folder = os.path.dirname(keep)
+    for entry in os.listdir(folder):
+        path = os.path.join(folder, entry)
+        if entry.endswith('.json') and path != keep and (entry.startswith(f'{name}-') or '-' not in entry):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
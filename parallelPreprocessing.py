@@ -0,0 +1,48 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Worker processes of the preprocessing (PREPROCESSING_WORKERS), 1 keeps everything in the calling process.
+# The app stays serial by default, offline builds of large registers use one worker per core, e.g.
+#   python parallelPreprocessing.py Datasets/synthetic/Lobbyregister_synthetic_full.csv --workers 16
+WORKERS = int(os.environ.get('PREPROCESSING_WORKERS', 1))
+
+# Partitions per worker, smaller partitions even out slow and fast partitions
+PARTITIONS_PER_WORKER = 4
+
+
+# Contiguous row partitions of the frame, in order
+def split_rows(df, partitions):
+    bounds = np.linspace(0, len(df), min(partitions, len(df)) + 1, dtype=int)
+    return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+# func of every item in worker processes, the results are in the order of the items (not of completion)
+def map_in_processes(func, items, workers=WORKERS, initializer=None, initargs=()):
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        return list(executor.map(func, items))
+
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    from datasetPreprocessingExplore import load_preprocessed_dataset
+    from datasetPreprocessingInsights import load_interests
+
+    parser = argparse.ArgumentParser(description='Build the preprocessed snapshots of a register with several processes')
+    parser.add_argument('file', nargs='?', default='Datasets/Lobbyregister2024_full.csv')
+    parser.add_argument('--cleaned', help='cleaned register, its interests table is built as well')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_preprocessed_dataset(args.file, workers=args.workers)
+    print(f'Preprocessed {len(df)} rows with {args.workers} workers in {time.perf_counter() - start:.1f}s')
+
+    if args.cleaned:
+        start = time.perf_counter()
+        df = load_interests(args.cleaned, pd.read_csv, workers=args.workers)
+        print(f'Homogenized {df["Interessen"].nunique()} interests with {args.workers} workers in {time.perf_counter() - start:.1f}s')
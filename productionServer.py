@@ -0,0 +1,78 @@
+import argparse
+import gc
+import os
+import signal
+
+# Production entry point. The master process imports the app (datasets, filter index and figures)
+# once and then forks the workers, which share this memory copy-on-write instead of each loading
+# their own copy. Needs gunicorn (Linux/macOS), e.g.
+#   python productionServer.py --workers 4 --threads 4
+# Plain gunicorn works as well, but only loads the data in the master with --preload and does not
+# reload the datasets (the watcher runs in the master started here):
+#   gunicorn --preload --workers 4 --threads 4 --bind 0.0.0.0:8050 app:server
+
+
+# Objects created so far are never collected, so the garbage collector of the workers
+# does not write to (and thereby copy) the pages of the shared datasets
+def freeze_shared_memory():
+    gc.collect()
+    gc.freeze()
+
+
+# Import the app and build all figures in the master process
+def load_app():
+    import app
+
+    app.current.figures.warm_up()
+    freeze_shared_memory()
+    return app.server
+
+
+# The master watches the dataset files and the reload trigger of the workers and reloads the datasets
+# itself. The workers are then replaced gracefully (SIGHUP) by new ones forked from the master, so all
+# of them serve the new version and share its memory instead of each loading a private copy.
+def start_reload_watcher(arbiter):
+    import app
+
+    apply = app.reloader.apply
+
+    def apply_in_master(staged):
+        apply(staged)
+        freeze_shared_memory()
+        os.kill(os.getpid(), signal.SIGHUP)
+
+    app.reloader.apply = apply_in_master
+    app.reloader.start_watching()
+
+
+def run(options):
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+
+        def load_config(self):
+            self.cfg.set('bind', f'{options.host}:{options.port}')
+            self.cfg.set('workers', options.workers)
+            self.cfg.set('threads', options.threads)
+            self.cfg.set('worker_class', 'gthread' if options.threads > 1 else 'sync')
+            self.cfg.set('timeout', options.timeout)
+            self.cfg.set('preload_app', True)
+            self.cfg.set('when_ready', start_reload_watcher)
+
+        def load(self):
+            return load_app()
+
+    Server().run()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the app with multiple worker processes')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8050)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1)),
+                        help='number of worker processes (WEB_CONCURRENCY)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('THREADS', 4)),
+                        help='threads per worker (THREADS)')
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('TIMEOUT', 120)),
+                        help='seconds before a busy worker is restarted (TIMEOUT)')
+    run(parser.parse_args())
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+# Ranges look like "490.001 bis 500.000 Euro" (spending) or "11 bis 20" (employees),
+# single values like "0 Euro" or "0" have no upper bound.
+# Numbers may contain '.' as thousands separator.
+RANGE_PATTERN = r'(?P<lower>\d+(?:\.\d{3})*)(?: bis (?P<upper>\d+(?:\.\d{3})*))?'
+
+# Compact dtype for the bounds, registers stay far below 2 billion Euro per band
+BOUND_DTYPE = np.int32
+
+
+# Convert a column of extracted numbers to int, missing numbers become 0
+def _to_bound(numbers):
+    numbers = numbers.str.replace('.', '', regex=False)
+    return pd.to_numeric(numbers, errors='coerce').fillna(0).to_numpy(dtype=BOUND_DTYPE)
+
+
+# Midpoint of the range, rounded down like the former int cast of (lower + upper) / 2
+def range_midpoint(lower, upper):
+    return ((lower.astype(np.int64) + upper) // 2).astype(BOUND_DTYPE)
+
+
+# Parse a column of ranges with a single regex pass and return lower bound, upper bound and midpoint
+def parse_range(values):
+    bounds = values.str.extract(RANGE_PATTERN)
+    lower = _to_bound(bounds['lower'])
+    upper = _to_bound(bounds['upper'])
+    return lower, upper, range_midpoint(lower, upper)
+
+
+# Average spending per employee, entities without employees get inf (or NaN without spending)
+def amount_per_employee(amount, employees):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return amount / employees.astype(np.float64)
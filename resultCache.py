@@ -0,0 +1,96 @@
+import json
+import threading
+from collections import OrderedDict
+
+from plotly.utils import PlotlyJSONEncoder
+
+# Memory budget of the explore table cache, approximate (see estimate_size)
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+MAX_CACHE_ENTRIES = 4096
+
+
+# Approximate size of a response in bytes, about the length of its JSON. Lists of dicts (the rows of
+# a table page) are estimated from a few rows, so a response is not serialized just to measure it.
+def estimate_size(value):
+    if isinstance(value, (list, tuple)):
+        if len(value) > 3 and isinstance(value[0], dict):
+            sample = [value[0], value[len(value) // 2], value[-1]]
+            return len(value) * sum(estimate_size(row) for row in sample) // len(sample)
+        return 2 + sum(estimate_size(item) + 1 for item in value)
+    if isinstance(value, dict):
+        return 2 + sum(len(str(key)) + estimate_size(item) + 4 for key, item in value.items())
+    if isinstance(value, str):
+        return len(value) + 2
+    return len(json.dumps(value, cls=PlotlyJSONEncoder))
+
+
+# Least recently used cache for callback responses, bounded by the number of entries and by the
+# estimated size of the responses (the Python objects take more memory than their JSON, the budget
+# is approximate). Keys should contain the dataset version.
+class ResultCache:
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, max_entries=MAX_CACHE_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    # Cached response for the key, or None
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    # Store a response, the least recently used responses are dropped when the budget is exceeded
+    def put(self, key, response):
+        size = estimate_size(response)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (response, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self.entries) > self.max_entries:
+                self.bytes -= self.entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    # Response for the key, computed with `compute` on a miss
+    def get_or_compute(self, key, compute):
+        response = self.get(key)
+        if response is None:
+            response = compute()
+            self.put(key, response)
+        return response
+
+    # Drop all responses, e.g. when the dataset was reloaded
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    # Hit and miss counters and the current size
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self.entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes}
+
+
+# Hashable cache key, lists and dicts (e.g. multi selects and sort_by) are turned into tuples
+def cache_key(*parts):
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(item) for item in value)
+        return value
+    return freeze(parts)
@@ -0,0 +1,144 @@
+import argparse
+import datetime
+import os
+import shutil
+
+import pandas as pd
+
+from datasetDtypes import arrow_schema
+
+# Store of preprocessed register snapshots, one per publication of the register. The snapshots are
+# Parquet files partitioned by snapshot date and fiscal year (hive layout), queries only read the
+# partitions and columns they need, so the history never has to be in memory at once:
+#   Datasets/history/snapshot_date=2024-06-30/fiscal_year=2022/part-0.parquet
+STORE_DIR = 'Datasets/history'
+
+# Columns shown by the spending trend of an entry
+TREND_COLUMNS = ['RegNr', 'Name', 'Fiscal Year', 'lower_bound_amount', 'upper_bound_amount', 'Ø Amount', 'Ø Employees']
+
+
+# Partition columns of the store, the snapshot date as ISO string and the start year of the fiscal year
+def partitioning(fields=('snapshot_date', 'fiscal_year')):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    types = {'snapshot_date': pa.string(), 'fiscal_year': pa.int16()}
+    return ds.partitioning(pa.schema([(field, types[field]) for field in fields]), flavor='hive')
+
+
+# Snapshot date of a register file, the register does not contain it so the modification date is used
+def file_date(file_path):
+    return datetime.date.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+
+
+class SnapshotStore:
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def dataset(self):
+        import pyarrow.dataset as ds
+
+        # Partially written snapshots start with a dot and are ignored
+        return ds.dataset(self.root, format='parquet', partitioning=partitioning())
+
+    # Preprocess a register file and store it as the snapshot of the date (the modification date by default).
+    # A snapshot of the same date is replaced.
+    def add(self, file_path, snapshot_date=None):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        from datasetPreprocessingExplore import preprocess_dataset
+
+        snapshot_date = datetime.date.fromisoformat(snapshot_date or file_date(file_path)).isoformat()
+        df = preprocess_dataset(pd.read_csv(file_path))
+        table = pa.Table.from_pandas(df, schema=arrow_schema(df), preserve_index=False)
+        table = table.append_column('fiscal_year', pa.array(df['Fiscal Year Start'].dt.year.astype('Int16'), pa.int16()))
+
+        # Written next to the store first, readers never see a half written snapshot
+        path = os.path.join(self.root, f'snapshot_date={snapshot_date}')
+        tmp_path = os.path.join(self.root, f'.snapshot_date={snapshot_date}.{os.getpid()}.tmp')
+        old_path = f'{tmp_path}.old'
+        try:
+            ds.write_dataset(table, tmp_path, format='parquet', partitioning=partitioning(['fiscal_year']))
+            if os.path.exists(path):
+                os.replace(path, old_path)
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                # Put the previous snapshot back, it is only removed once the new one is in place
+                if os.path.exists(old_path):
+                    os.replace(old_path, path)
+                raise
+            shutil.rmtree(old_path, ignore_errors=True)
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return snapshot_date, len(df)
+
+    # Dates of the stored snapshots, oldest first (from the folder names, no data is read)
+    def snapshots(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(entry.split('=', 1)[1] for entry in os.listdir(self.root) if entry.startswith('snapshot_date='))
+
+    # Fiscal years stored for a snapshot (all snapshots by default), from the partition folders
+    def fiscal_years(self, snapshot_date=None):
+        import pyarrow.dataset as ds
+
+        years = set()
+        for fragment in self.dataset().get_fragments():
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            if snapshot_date is None or keys.get('snapshot_date') == snapshot_date:
+                years.add(keys.get('fiscal_year'))
+        return sorted(year for year in years if year is not None)
+
+    # Rows of the selected snapshots and fiscal years (all by default). Only the matching partitions are read,
+    # `columns` limits the columns read and `filter` is an additional pyarrow expression (e.g. on RegNr).
+    def load(self, snapshot_dates=None, fiscal_years=None, columns=None, filter=None):
+        import pyarrow.dataset as ds
+
+        expression = filter
+        for field, values in (('snapshot_date', snapshot_dates), ('fiscal_year', fiscal_years)):
+            if values is not None:
+                condition = ds.field(field).isin(list(values))
+                expression = condition if expression is None else expression & condition
+
+        if columns is not None:
+            columns = list(dict.fromkeys([*columns, 'snapshot_date', 'fiscal_year']))
+        return self.dataset().to_table(columns=columns, filter=expression).to_pandas()
+
+    # Spending of the entries in every snapshot and fiscal year, ordered by fiscal year and snapshot
+    def spending_trend(self, reg_nrs, snapshot_dates=None, fiscal_years=None):
+        import pyarrow.dataset as ds
+
+        reg_nrs = [reg_nrs] if isinstance(reg_nrs, str) else list(reg_nrs)
+        df = self.load(snapshot_dates, fiscal_years, TREND_COLUMNS, filter=ds.field('RegNr').isin(reg_nrs))
+        return df.sort_values(['RegNr', 'fiscal_year', 'snapshot_date'], kind='stable').reset_index(drop=True)
+
+    # Remove a snapshot
+    def remove(self, snapshot_date):
+        shutil.rmtree(os.path.join(self.root, f'snapshot_date={snapshot_date}'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Store register snapshots and query their history')
+    parser.add_argument('--store', default=STORE_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help='preprocess a register CSV and store it as a snapshot')
+    add.add_argument('file')
+    add.add_argument('--date', help='snapshot date (YYYY-MM-DD), the modification date of the file by default')
+    commands.add_parser('list', help='list the stored snapshots and their fiscal years')
+    trend = commands.add_parser('trend', help='spending of entries across the stored snapshots')
+    trend.add_argument('reg_nrs', nargs='+')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store)
+    if args.command == 'add':
+        snapshot_date, rows = store.add(args.file, args.date)
+        print(f'Stored {rows} rows as snapshot {snapshot_date}')
+    elif args.command == 'list':
+        for snapshot_date in store.snapshots():
+            print(snapshot_date, ', '.join(map(str, store.fiscal_years(snapshot_date))))
+    else:
+        with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.max_columns', None):
+            print(store.spending_trend(args.reg_nrs))
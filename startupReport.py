@@ -0,0 +1,56 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Startup report: imports a module in a fresh interpreter with -X importtime and lists the
+# slowest imports. The time of the module itself includes the work it does at import (e.g. app
+# loads the datasets), everything else should be imported lazily where it is needed.
+#   python startupReport.py --module app --top 20
+
+
+# Rows of the -X importtime output as (self us, cumulative us, depth, module)
+def parse_importtime(output):
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def run(module):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'})
+    wall_time = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    return wall_time, parse_importtime(result.stderr)
+
+
+def report(module, top):
+    wall_time, rows = run(module)
+
+    print(f'Startup of {module}: {wall_time:.2f}s wall time (including interpreter start)')
+
+    # Packages imported directly by the module or its own modules
+    print(f'\nSlowest imports (cumulative), top {top}')
+    for self_us, cumulative_us, depth, name in sorted(rows, key=lambda row: -row[1])[:top]:
+        print(f'{cumulative_us / 1e3:10.1f} ms  {"  " * depth}{name}')
+
+    # Work done by the modules themselves, without their imports
+    print(f'\nSlowest modules (self), top {top}')
+    for self_us, cumulative_us, depth, name in sorted(rows, key=lambda row: -row[0])[:top]:
+        print(f'{self_us / 1e3:10.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report the import time of the app')
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+    report(args.module, args.top)
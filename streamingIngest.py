@@ -0,0 +1,81 @@
+import argparse
+import os
+
+import pandas as pd
+
+from datasetCache import CACHE_DIR, evict_snapshots, file_hash, snapshot_key, snapshot_path
+from datasetDtypes import ORIGINAL_SCHEMA, arrow_schema
+from datasetPreprocessingExplore import PREPROCESSING_VERSION, preprocess_dataset
+from deltaIngest import KEY_COLUMN, row_hashes, rows_path
+
+# Streaming build of the preprocessed snapshot for registers that do not fit into memory. The raw CSV
+# is read in chunks of CHUNK_ROWS rows, every chunk is preprocessed on its own and appended to the
+# snapshot, so the peak memory depends on the chunk size and not on the size of the register.
+# The snapshot is the one load_preprocessed_dataset uses, e.g. build it on a worker node with
+#   python streamingIngest.py Datasets/Lobbyregister2024_full.csv --chunk-rows 50000
+CHUNK_ROWS = int(os.environ.get('INGEST_CHUNK_ROWS', 50_000))
+
+# Same dtypes in every chunk, otherwise a text column without values in a chunk is read as float
+RAW_DTYPES = {column: object if kind in ('text', 'category') else 'float64'
+              for column, kind in ORIGINAL_SCHEMA.items() if column != ' index'}
+
+
+# Raw register in chunks, the index of every chunk continues the positions in the file
+def read_chunks(file_path, chunk_rows=CHUNK_ROWS):
+    return pd.read_csv(file_path, chunksize=chunk_rows, dtype=RAW_DTYPES)
+
+
+# Preprocess the register chunk by chunk into its snapshot (with the row hashes for incremental updates).
+# The chunks are sorted by name on their own, load_preprocessed_dataset sorts the whole register.
+def stream_preprocessed_snapshot(file_path, chunk_rows=CHUNK_ROWS, cache_dir=CACHE_DIR, content_hash=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    key = snapshot_key(file_path, PREPROCESSING_VERSION, content_hash or file_hash(file_path))
+    path = snapshot_path(file_path, key, cache_dir)
+    hashes_path = rows_path(path, PREPROCESSING_VERSION)
+    tmp_path, tmp_hashes_path = f'{path}.{os.getpid()}.tmp', f'{hashes_path}.{os.getpid()}.tmp'
+    hashes_schema = pa.schema([(KEY_COLUMN, pa.string()), ('row_hash', pa.uint64())])
+
+    os.makedirs(cache_dir, exist_ok=True)
+    writer = hashes_writer = None
+    rows = 0
+    try:
+        hashes_writer = pq.ParquetWriter(tmp_hashes_path, hashes_schema)
+        for chunk in read_chunks(file_path, chunk_rows):
+            hashes_writer.write_table(pa.table({KEY_COLUMN: chunk[KEY_COLUMN].to_numpy(),
+                                                'row_hash': row_hashes(chunk)}, schema=hashes_schema))
+
+            # Positions in the register instead of the chunk
+            df = preprocess_dataset(chunk)
+            df[' index'] = df.index + 1
+
+            # The schema of the first chunk is kept for all chunks
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, arrow_schema(df, preserve_index=True))
+            writer.write_table(pa.Table.from_pandas(df, schema=writer.schema, preserve_index=True))
+            rows += len(df)
+
+        if writer is None:
+            raise ValueError(f'{file_path} has no rows')
+        writer.close()
+        hashes_writer.close()
+        os.replace(tmp_path, path)
+        os.replace(tmp_hashes_path, hashes_path)
+        evict_snapshots(file_path, path, cache_dir)
+    finally:
+        for tmp in (tmp_path, tmp_hashes_path):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return path, rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Preprocess a register CSV chunk by chunk into its snapshot')
+    parser.add_argument('file', nargs='?', default='Datasets/Lobbyregister2024_full.csv')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='rows per chunk (INGEST_CHUNK_ROWS)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    path, rows = stream_preprocessed_snapshot(args.file, args.chunk_rows, args.cache_dir)
+    print(f'Stored {rows} rows in {path}')
@@ -0,0 +1,254 @@
+# Synthetic registers for benchmarks and load tests. Writes a register with the columns and value formats
+# of Lobbyregister2024_full.csv and a cleaned register in the format of cleanedLobbyregister2024.csv.
+# The distributions (entity types, amounts, employees, fiscal years, interests) follow the 2024 register.
+# Rows are generated and written in chunks, so millions of rows need little memory. The same seed and
+# chunk size always give the same files.
+#
+# Run with:  python syntheticRegister.py --rows 5000000
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from datasetPreprocessingExplore import parse_fiscal_years
+from datasetPreprocessingInsights import interest_to_supercategory
+from rangeParsing import parse_range
+
+# Generated files are not versioned
+SYNTHETIC_DIR = 'Datasets/synthetic'
+
+COLUMNS = ['Name', 'RegNr', 'Ersteintrag', 'LetzteÄnd', 'Tätigkeit', 'Interessen', 'FinanzAufw', 'Betrag',
+           'Geschäftsjahr', 'VollzeitEquiv', 'Regelungen', 'Stellungnahmen', 'GrundVerweig', 'Beschäftigte',
+           'Auftraggeber']
+CLEANED_COLUMNS = ['Name', 'RegNr', 'Beschäftigte', 'Betrag', 'GeschäftsjahrStart', 'GeschäftsjahrEnde',
+                   'Interessen', 'Tätigkeit', 'Ersteintrag', 'LetzteÄnd']
+
+# Entity types of the 2024 register with their number of entries
+ENTITY_COUNTS = {
+    'Unternehmen': 2049,
+    'Privatrechtliche Organisation mit Gemeinwohlaufgaben (z.\xa0B. eingetragene Vereine, Stiftungen) (GL2022)': 1266,
+    'Wirtschaftsverband oder Gewerbeverband/-verein': 829,
+    'Berufsverband': 657,
+    'Nichtstaatliche Organisation (Nichtregierungsorganisation, Plattform oder Netzwerk) (GL2022)': 527,
+    'Beratungsunternehmen, selbständige Beraterin oder selbständiger Berater': 371,
+    'Sonstige Organisation': 178,
+    'Privatrechtliche Organisation mit Anerkennung der Gemeinnützigkeit nach Abgabenordnung': 176,
+    'Wissenschaft, Denkfabrik, Forschungseinrichtung oder Hochschule (GL2022)': 113,
+    'Privatperson': 107,
+    'Arbeitgeberverband': 78,
+    'Privatrechtliche Organisation': 55,
+    'Anwaltskanzlei, Einzelanwältin oder Einzelanwalt': 48,
+    'Plattform, Netzwerk, Interessengemeinschaft, Denkfabrik, Initiative, Aktionsbündnis o. ä.': 46,
+    'Öffentlich-rechtliche Organisation (z. B. Körperschaften, Anstalten und Stiftungen des öffentlichen Rechts) (GL2022)': 33,
+    'Nichtregierungsorganisation (NGO)': 25,
+    'Wissenschaft, Hochschule oder Forschungseinrichtung': 20,
+    'Arbeitnehmerverband': 20,
+    'Kirche oder andere Religions- oder Weltanschauungsgemeinschaft': 11,
+    'Außenhandelskammer, bilaterale Industrie- und Handelskammer, bilateraler Wirtschaftsverband': 6,
+    'Juristische Person des öffentlichen Rechts': 5,
+    'Privatrechtlich organisierter Zusammenschluss von Kammern': 3,
+}
+
+NAME_STEMS = ['Verband', 'Institut', 'Gesellschaft', 'Initiative', 'Forum', 'Netzwerk', 'Holding', 'Bündnis',
+              'Beratung', 'Werke', 'Stiftung', 'Vereinigung']
+LEGAL_FORMS = ['GmbH', 'e.V.', 'AG', 'GmbH & Co. KG', 'SE', 'KG', 'eG', 'gGmbH']
+
+# Entries without financial information ("FinanzAufw" instead of "Betrag" and "Geschäftsjahr")
+NO_FINANCES_SHARE = 0.115
+NO_FINANCES_REASONS = ['Angabe verweigert', 'Keine Angaben, da noch kein Geschäftsjahr vollständig abgeschlossen wurde.']
+NO_FINANCES_WEIGHTS = [0.65, 0.35]
+
+# Entries in the newer format, with full time equivalents and regulations instead of the employee range
+NEW_FORMAT_SHARE = 0.11
+NO_FULL_TIME_SHARE = 0.025
+STATEMENTS_SHARE = 0.011
+CLIENTS_SHARE = 0.078
+REFUSAL_SHARE = 0.027
+REFUSAL_REASONS = ['Keine Aufwendungen', 'Wird nachgereicht', 'Ist sehr anlassbezogen und schwankt stark.',
+                   'Die Interessenvertretung erfolgt grundsätzlich durch den Dachverband.']
+
+# Amounts come in ranges of 10.000 Euro ("490.001 bis 500.000 Euro"), employees in ranges of 10 ("11 bis 20")
+# Shares of zero and of the lowest range, above that the ranges follow a Lomax (Pareto II) distribution
+ZERO_AMOUNT_SHARE = 0.17
+LOWEST_AMOUNT_RANGE_SHARE = 0.30
+AMOUNT_TAIL = (1.1, 7.4)
+MAX_AMOUNT_RANGE = 2000
+ZERO_EMPLOYEES_SHARE = 0.11
+LOWEST_EMPLOYEE_RANGE_SHARE = 0.76
+EMPLOYEE_TAIL = (1.2, 1.06)
+MAX_EMPLOYEE_RANGE = 99
+
+# Fiscal years, mostly calendar years
+CALENDAR_YEARS = {2020: 0.006, 2021: 0.055, 2022: 0.8, 2023: 0.139}
+CALENDAR_YEAR_SHARE = 0.93
+
+# Registrations started on 14.02.2022, a third of the entries were made in the first weeks
+FIRST_ENTRY = np.datetime64('2022-02-14')
+RUSH_END = np.datetime64('2022-03-10')
+LAST_ENTRY = np.datetime64('2024-04-28')
+RUSH_SHARE = 0.35
+UNCHANGED_SHARE = 0.13
+
+# Entities have about 10 interests on average, a few have more than 100
+MEAN_INTERESTS = 10.2
+
+
+# Labels of all amount ranges, index 0 is "0 Euro" and index 1 "1 bis 10.000 Euro"
+def amount_labels():
+    labels = [f'{band * 10000 + 1:,} bis {(band + 1) * 10000:,} Euro'.replace(',', '.') for band in range(MAX_AMOUNT_RANGE)]
+    return np.array(['0 Euro'] + labels, dtype=object)
+
+
+# Labels of all employee ranges, index 0 is "0" and index 1 "1 bis 10"
+def employee_labels():
+    labels = [f'{band * 10 + 1} bis {(band + 1) * 10}' for band in range(MAX_EMPLOYEE_RANGE)]
+    return np.array(['0'] + labels, dtype=object)
+
+
+# Index into the range labels (0 is zero, 1 the lowest range) with a heavy tail
+def range_bands(rng, n, zero_share, lowest_share, tail, max_band):
+    shape, scale = tail
+    bands = np.minimum(2 + np.floor(rng.pareto(shape, n) * scale), max_band).astype(np.int64)
+    share = rng.random(n)
+    bands[share < zero_share + lowest_share] = 1
+    bands[share < zero_share] = 0
+    return bands
+
+
+def fiscal_years(rng, n):
+    years = rng.choice(list(CALENDAR_YEARS), n, p=np.array(list(CALENDAR_YEARS.values())) / sum(CALENDAR_YEARS.values()))
+    start_months = np.where(rng.random(n) < CALENDAR_YEAR_SHARE, 1, rng.integers(2, 13, n))
+    end_months = (start_months + 10) % 12 + 1
+    end_years = np.where(start_months == 1, years, years + 1)
+    return pd.Series([f'{sm:02d}/{sy % 100:02d} bis {em:02d}/{ey % 100:02d}'
+                      for sm, sy, em, ey in zip(start_months, years, end_months, end_years)], dtype=object)
+
+
+# Registration dates, rising with the register number
+def entry_dates(numbers, total):
+    share = (numbers - 0.5) / total
+    rush_days = (RUSH_END - FIRST_ENTRY).astype(int)
+    later_days = (LAST_ENTRY - RUSH_END).astype(int)
+    days = np.where(share < RUSH_SHARE,
+                    share / RUSH_SHARE * rush_days,
+                    rush_days + (share - RUSH_SHARE) / (1 - RUSH_SHARE) * later_days)
+    return FIRST_ENTRY + days.astype('timedelta64[D]')
+
+
+# Interests separated by "; " in the order of the taxonomy, popular interests are picked more often
+def interest_lists(rng, n, names, weights):
+    counts = np.minimum(rng.geometric(1 / MEAN_INTERESTS, n), len(names))
+
+    # Weighted sampling without replacement: the interests with the largest log(u) / weight are picked
+    keys = (np.log(1 - rng.random((n, len(names)), dtype=np.float32)) / weights).astype(np.float32)
+    thresholds = np.take_along_axis(np.sort(keys, axis=1), (len(names) - counts)[:, None], axis=1)
+    selected = keys >= thresholds
+    return pd.Series(['; '.join(names[row]) for row in selected], dtype=object)
+
+
+# Optional integer column (empty for most entries)
+def sparse_counts(rng, n, share, mean, minimum=0):
+    values = pd.Series(minimum + rng.poisson(mean, n), dtype='Int64')
+    return values.where(rng.random(n) < share)
+
+
+def generate_chunk(rng, numbers, total, interest_names, interest_weights):
+    n = len(numbers)
+
+    entities = np.array(list(ENTITY_COUNTS), dtype=object)
+    entity_weights = np.array(list(ENTITY_COUNTS.values()), dtype=float)
+
+    names = pd.Series([f'{stem} {number:07d} {form}' for stem, number, form in
+                       zip(rng.choice(NAME_STEMS, n), numbers, rng.choice(LEGAL_FORMS, n))], dtype=object)
+
+    first_entries = entry_dates(numbers, total)
+    changed = first_entries + (rng.random(n) * (LAST_ENTRY - first_entries).astype(int)).astype('timedelta64[D]')
+    last_changes = pd.Series(pd.to_datetime(changed).strftime('%d.%m.%Y'), dtype=object)
+    last_changes[rng.random(n) < UNCHANGED_SHARE] = '–'
+
+    no_finances = rng.random(n) < NO_FINANCES_SHARE
+    new_format = rng.random(n) < NEW_FORMAT_SHARE
+
+    amounts = pd.Series(amount_labels()[range_bands(rng, n, ZERO_AMOUNT_SHARE, LOWEST_AMOUNT_RANGE_SHARE, AMOUNT_TAIL, MAX_AMOUNT_RANGE)])
+    employees = pd.Series(employee_labels()[range_bands(rng, n, ZERO_EMPLOYEES_SHARE, LOWEST_EMPLOYEE_RANGE_SHARE, EMPLOYEE_TAIL, MAX_EMPLOYEE_RANGE)])
+    full_time = pd.Series(np.where(rng.random(n) < 0.3, 0, np.round(rng.lognormal(-1, 1.5, n), 2))).map('{:.2f}'.format)
+    full_time[rng.random(n) < NO_FULL_TIME_SHARE] = NO_FINANCES_REASONS[1]
+
+    df = pd.DataFrame({
+        'Name': names,
+        'RegNr': [f'R{number:06d}' for number in numbers],
+        'Ersteintrag': pd.to_datetime(first_entries).strftime('%d.%m.%Y'),
+        'LetzteÄnd': last_changes,
+        'Tätigkeit': rng.choice(entities, n, p=entity_weights / entity_weights.sum()),
+        'Interessen': interest_lists(rng, n, interest_names, interest_weights),
+        'FinanzAufw': pd.Series(rng.choice(NO_FINANCES_REASONS, n, p=NO_FINANCES_WEIGHTS), dtype=object).where(no_finances),
+        'Betrag': amounts.where(~no_finances),
+        'Geschäftsjahr': fiscal_years(rng, n).where(~no_finances),
+        'VollzeitEquiv': full_time.where(new_format),
+        'Regelungen': sparse_counts(rng, n, 1, 0.6).where(new_format),
+        'Stellungnahmen': sparse_counts(rng, n, STATEMENTS_SHARE, 0.3, minimum=1),
+        'GrundVerweig': pd.Series(rng.choice(REFUSAL_REASONS, n), dtype=object).where(rng.random(n) < REFUSAL_SHARE),
+        'Beschäftigte': employees.where(~new_format),
+        'Auftraggeber': sparse_counts(rng, n, CLIENTS_SHARE, 1.5, minimum=1),
+    })
+    return df[COLUMNS]
+
+
+# Cleaned register: entries with employees and more than 10.000 Euro, amounts and employees as the
+# middle of their range (at least one employee) and the fiscal year as start and end date
+def clean_chunk(df):
+    _, _, amount = parse_range(df['Betrag'])
+    _, _, employees = parse_range(df['Beschäftigte'])
+    fiscal_year = parse_fiscal_years(df['Geschäftsjahr'])
+
+    keep = (amount > 10000) & df['Beschäftigte'].notna() & fiscal_year['start'].notna()
+    cleaned = df.loc[keep, ['Name', 'RegNr', 'Interessen', 'Tätigkeit', 'Ersteintrag', 'LetzteÄnd']]
+    cleaned['Beschäftigte'] = np.maximum(employees[keep], 1)
+    cleaned['Betrag'] = amount[keep]
+    cleaned['GeschäftsjahrStart'] = fiscal_year.loc[keep, 'start'].dt.strftime('%Y-%m-%d')
+    cleaned['GeschäftsjahrEnde'] = fiscal_year.loc[keep, 'end'].dt.strftime('%Y-%m-%d')
+    return cleaned[CLEANED_COLUMNS]
+
+
+# Write both registers, newest entries first like the published register
+def generate(rows, output, cleaned_output, seed=0, chunk_size=50000):
+    interest_names = np.array([interest for interests in interest_to_supercategory.values() for interest in interests], dtype=object)
+
+    # Popularity of the interests, the same for all chunks
+    popularity = np.random.default_rng(seed).permutation(len(interest_names))
+    interest_weights = (1 / (popularity + 1) ** 0.7).astype(np.float32)
+
+    tmp_paths = [f'{path}.{os.getpid()}.tmp' for path in (output, cleaned_output)]
+    for path in (output, cleaned_output):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    try:
+        for chunk, end in enumerate(range(rows, 0, -chunk_size)):
+            rng = np.random.default_rng([seed, chunk])
+            numbers = np.arange(end, max(end - chunk_size, 0), -1)
+            df = generate_chunk(rng, numbers, rows, interest_names, interest_weights)
+
+            mode = 'w' if chunk == 0 else 'a'
+            df.to_csv(tmp_paths[0], mode=mode, header=chunk == 0, index=False)
+            clean_chunk(df).to_csv(tmp_paths[1], mode=mode, header=chunk == 0, index=False)
+
+        for tmp_path, path in zip(tmp_paths, (output, cleaned_output)):
+            os.replace(tmp_path, path)
+    finally:
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic register for benchmarks and load tests.')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--output', default=os.path.join(SYNTHETIC_DIR, 'Lobbyregister_synthetic.csv'))
+    parser.add_argument('--cleaned-output', default=os.path.join(SYNTHETIC_DIR, 'cleanedLobbyregister_synthetic.csv'))
+    args = parser.parse_args()
+
+    generate(args.rows, args.output, args.cleaned_output, args.seed, args.chunk_size)
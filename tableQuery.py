@@ -0,0 +1,194 @@
+import math
+import numbers
+import re
+
+import numpy as np
+import pandas as pd
+
+# Rows per table page, only this many rows are sent to the browser
+PAGE_SIZE = 100
+
+# Column and value of a filter part, values are quoted text or a word (backslashes escape the next character)
+FIELD_PATTERN = r'\{(?P<column>(?:[^{}\\]|\\.)+)\}'
+VALUE_PATTERN = r'''(?P<value>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`(?:[^`\\]|\\.)*`|(?:[^\s'"`{}()\\]|\\.)+)'''
+
+# One part of a Dash filter_query, e.g. {Ø Amount} > 5000, {Name} icontains "GmbH" or {Auftraggeber} is blank.
+# Relational operators may have an i (case insensitive) or s (case sensitive) prefix.
+FILTER_PART_PATTERN = re.compile(
+    rf'\s*{FIELD_PATTERN}\s*(?:'
+    r'is\s+(?P<unary>blank|bool|even|nil|num|object|odd|prime|str)(?![^\s&])'
+    rf'|(?P<operator>[is]?(?:(?:contains|datestartswith|eq|ne|lt|le|gt|ge)(?=\s)|>=|<=|!=|=|<|>))\s*{VALUE_PATTERN}'
+    r')\s*',
+    re.IGNORECASE
+)
+
+# Supported operators, without the case prefix
+OPERATORS = {'contains', 'datestartswith', 'eq', 'ne', 'lt', 'le', 'gt', 'ge'}
+
+# Short forms of the relational operators
+OPERATOR_NAMES = {'>=': 'ge', '<=': 'le', '!=': 'ne', '=': 'eq', '<': 'lt', '>': 'gt'}
+
+
+# A filter query the table can not apply, the table keeps its rows and shows the message
+class FilterQueryError(ValueError):
+    pass
+
+
+# Column, operator, case sensitivity and value of a matched filter part. Unary operators have no value.
+def filter_part(match):
+    column = re.sub(r'\\(.)', r'\1', match.group('column'))
+    if match.group('unary'):
+        return column, match.group('unary').lower(), False, None
+
+    operator, value = match.group('operator').lower(), match.group('value')
+    case_insensitive = False
+    if operator[0] in 'is' and (operator[1:] in OPERATORS or operator[1:] in OPERATOR_NAMES):
+        case_insensitive = operator[0] == 'i'
+        operator = operator[1:]
+    operator = OPERATOR_NAMES.get(operator, operator)
+
+    # Remove quotes around the value, unquoted values may be numbers
+    if value[0] in '"\'`':
+        value = re.sub(r'\\(.)', r'\1', value[1:-1])
+    else:
+        value = re.sub(r'\\(.)', r'\1', value)
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+
+    return column, operator, case_insensitive, value
+
+
+# Split a Dash filter_query into its parts, combined with &&. Other syntax (||, !, parentheses)
+# raises a FilterQueryError.
+def split_filter_query(filter_query):
+    parts, position = [], 0
+    while True:
+        match = FILTER_PART_PATTERN.match(filter_query, position)
+        if match is None:
+            raise FilterQueryError(f'Unsupported filter: {filter_query[position:].strip()}')
+        parts.append(filter_part(match))
+        position = match.end()
+        if position == len(filter_query):
+            return parts
+        if not filter_query.startswith('&&', position):
+            raise FilterQueryError(f'Unsupported filter: {filter_query[position:].strip()}')
+        position += 2
+
+
+# Type of a cell as the table sees it in the JSON it is sent (dates are sent as text)
+def json_type(value):
+    if isinstance(value, (dict, list)):
+        return 'object'
+    if pd.isna(value):
+        return 'nil'
+    if isinstance(value, (bool, np.bool_)):
+        return 'bool'
+    if isinstance(value, numbers.Number):
+        return 'num'
+    return 'str'
+
+
+def is_prime(number):
+    if number != int(number) or number < 2:
+        return False
+    number = int(number)
+    if number % 2 == 0:
+        return number == 2
+    return all(number % divisor for divisor in range(3, math.isqrt(number) + 1, 2))
+
+
+# Unary operator of a single cell, the same checks as the filters of the table in the browser
+def unary_match(operator, value):
+    kind = json_type(value)
+    if operator == 'blank':
+        return kind == 'nil' or (kind == 'str' and value == '')
+    if operator in ('bool', 'nil', 'num', 'object', 'str'):
+        return kind == operator
+    if kind != 'num':
+        return False
+    if operator == 'even':
+        return math.fmod(value, 2) == 0
+    if operator == 'odd':
+        return math.fmod(value, 2) == 1
+    return is_prime(value)
+
+
+# Mask of a unary operator, every distinct value is checked once
+def unary_mask(series, operator):
+    codes, uniques = pd.factorize(series)
+    matches = np.array([unary_match(operator, value) for value in uniques] + [unary_match(operator, None)], dtype=bool)
+    return pd.Series(matches[codes], index=series.index)
+
+
+# Mask of the rows matching a single filter part
+def filter_mask(series, operator, case_insensitive, value):
+    if value is None:
+        return unary_mask(series, operator)
+
+    numeric = pd.api.types.is_numeric_dtype(series) and isinstance(value, float)
+
+    if operator in ('contains', 'datestartswith') or not numeric:
+        text = series.astype('string')
+        value = str(value) if not isinstance(value, float) or not value.is_integer() else str(int(value))
+        if case_insensitive:
+            text = text.str.lower()
+            value = value.lower()
+        if operator == 'contains':
+            return text.str.contains(value, regex=False).fillna(False)
+        if operator == 'datestartswith':
+            return text.str.startswith(value).fillna(False)
+        series = text
+
+    if operator == 'eq':
+        return (series == value).fillna(False)
+    if operator == 'ne':
+        return (series != value).fillna(True)
+    if operator == 'lt':
+        return (series < value).fillna(False)
+    if operator == 'le':
+        return (series <= value).fillna(False)
+    if operator == 'gt':
+        return (series > value).fillna(False)
+    return (series >= value).fillna(False)
+
+
+# Apply a Dash filter_query. Expressions that can not be parsed raise a FilterQueryError,
+# parts on columns that are not shown do not filter.
+def filter_frame(df, filter_query):
+    if not filter_query:
+        return df
+    mask = None
+    for column, operator, case_insensitive, value in split_filter_query(filter_query):
+        if column not in df.columns:
+            continue
+        part_mask = filter_mask(df[column], operator, case_insensitive, value).to_numpy(dtype=bool)
+        mask = part_mask if mask is None else mask & part_mask
+    return df if mask is None else df[mask]
+
+
+# Apply the sort_by of the table (list of {'column_id', 'direction'})
+def sort_frame(df, sort_by):
+    sort_by = [col for col in (sort_by or []) if col['column_id'] in df.columns]
+    if not sort_by:
+        return df
+    return df.sort_values(
+        [col['column_id'] for col in sort_by],
+        ascending=[col['direction'] == 'asc' for col in sort_by],
+        kind='stable',
+        na_position='last',
+    )
+
+
+# Filter, sort and page a frame, returns the rows of the requested page, the number of pages and the page shown.
+# Only the selected columns of the requested page are copied.
+def query_table(df, columns, page_current, page_size, sort_by, filter_query):
+    page_size = page_size or PAGE_SIZE
+    df = sort_frame(filter_frame(df, filter_query), sort_by)
+
+    page_count = max(1, math.ceil(len(df) / page_size))
+    page_current = min(page_current or 0, page_count - 1)
+
+    page = df.iloc[page_current * page_size:(page_current + 1) * page_size]
+    return page[columns].to_dict('records'), page_count, page_current